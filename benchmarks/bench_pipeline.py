@@ -0,0 +1,128 @@
+"""
+Offline end-to-end benchmark of main.py's pipeline
+(Telegram -> stream_scrape / filter_relevant_jobs -> merge_sheet_jobs -> update_sheet).
+
+jobspy, Google Sheets and Telegram are replaced by the local fakes in
+benchmarks/fakes.py, so no network or credentials are needed. For each data
+volume the full run is timed and the per-stage numbers from the run report
+are printed.
+
+    python benchmarks/bench_pipeline.py --sizes 1000,10000,100000 \\
+        [--scrape-latency 0.05] [--sheets-latency 0.02] [--telegram-latency 0.01]
+"""
+import os
+import io
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import main
+import telegram_scraper
+from run_metrics import RunMetrics
+from query_planner import plan_queries, distinct_queries
+from fakes import FakeScraper, FakeSpreadsheet, FakeSheetsSession, make_fake_telegram_client
+
+REPORTED_STAGES = ["scrape_all", "scrape_telegram_jobs", "filter_relevant_jobs", "near_duplicates", "merge_sheet_jobs",
+                   "remove_expired_jobs", "update_sheet"]
+
+
+def install_fakes(args, total_jobs, workdir):
+    """
+    Points main.py at fresh fakes and an empty working directory.
+    Returns the fake scraper (for its call count).
+    """
+    plan = plan_queries(main.SEARCH_CONFIGS)
+    tasks = main.build_scrape_tasks(distinct_queries(plan))
+    rows_per_site = max(1, math.ceil(total_jobs / sum(len(task.sites) for task in tasks)))
+
+    scraper = FakeScraper(jobs_per_call=rows_per_site, latency=args.scrape_latency,
+                          overlap=args.overlap, cross_post=args.cross_post, description_chars=args.description_chars)
+    main.scrape_jobs = scraper
+    main.SHEETS = FakeSheetsSession(FakeSpreadsheet(latency=args.sheets_latency))
+    main.METRICS = RunMetrics()
+    main.JOB_STORE_PATH = os.path.join(workdir, "jobs.sqlite")
+    main._JOB_STORE = None
+    main.TELEGRAM_STATE_PATH = os.path.join(workdir, "telegram_state.json")
+    main.SCRAPE_WINDOW_PATH = os.path.join(workdir, "scrape_window.json")
+    main.SEEN_URLS_PATH = os.path.join(workdir, "seen_urls.bloom")
+    main.TELEGRAM_API_ID, main.TELEGRAM_API_HASH, main.TELEGRAM_SESSION_STRING = "1", "fake", "fake"
+    telegram_scraper.TelegramClient = make_fake_telegram_client(
+        channels=args.channels, messages_per_channel=args.messages_per_channel, latency=args.telegram_latency
+    )
+    telegram_scraper.StringSession = lambda session: session
+
+    # Measure our own code, not the production request pacing
+    backends = [main.site_group_backend(config["name"]) for config in main.SITE_GROUPS] + [main.SHEETS.backend]
+    for backend in backends:
+        backend.limiter = None
+    return scraper
+
+
+def run_scenario(args, total_jobs):
+    with tempfile.TemporaryDirectory() as workdir:
+        scraper = install_fakes(args, total_jobs, workdir)
+        report_path = os.path.join(workdir, "run_report.json")
+        output = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+            main.main(["--no-cache", "--report", report_path])
+        wall = time.perf_counter() - started
+        with open(report_path) as f:
+            report = json.load(f)
+
+    scraped = report["stages"]["scrape_all"]["rows_out"]
+    return {
+        "target_jobs": total_jobs,
+        "scraped_rows": scraped,
+        "scrape_calls": scraper.calls,
+        "wall_seconds": round(wall, 3),
+        "jobs_per_second": round(scraped / wall, 1) if wall else None,
+        "peak_rss_mb": report["peak_rss_mb"],
+        "sheets_calls": sum(entry["calls"] for entry in report["sheets"].values()),
+        "near_duplicates_merged": report["counters"].get("near_duplicates_merged", 0),
+        "stages": {name: report["stages"].get(name, {}) for name in REPORTED_STAGES},
+    }
+
+
+def print_results(results):
+    print(f"\n{'jobs':>8} {'scraped':>8} {'wall s':>8} {'jobs/s':>9} {'RSS MB':>8} {'sheets':>7} {'merged':>7}  "
+          + " ".join(f"{name[:14]:>14}" for name in REPORTED_STAGES))
+    for r in results:
+        stage_times = " ".join(f"{r['stages'][name].get('seconds_total', 0):>14.3f}" for name in REPORTED_STAGES)
+        print(f"{r['target_jobs']:>8} {r['scraped_rows']:>8} {r['wall_seconds']:>8.2f} {r['jobs_per_second']:>9} "
+              f"{r['peak_rss_mb'] or 0:>8} {r['sheets_calls']:>7} {r['near_duplicates_merged']:>7}  {stage_times}")
+    print("(stage columns: total seconds per stage)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated job volumes per run")
+    parser.add_argument("--scrape-latency", type=float, default=0.0, help="Seconds per fake scrape_jobs call")
+    parser.add_argument("--sheets-latency", type=float, default=0.0, help="Seconds per fake Sheets API call")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="Seconds per 100 fake Telegram messages")
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--messages-per-channel", type=int, default=200)
+    parser.add_argument("--overlap", type=float, default=0.3, help="Share of postings found by several terms")
+    parser.add_argument("--cross-post", type=float, default=0.2, help="Share of postings listed on every board of a group")
+    parser.add_argument("--description-chars", type=int, default=1500)
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"▶ Running pipeline with ~{size} jobs...")
+        results.append(run_scenario(args, size))
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
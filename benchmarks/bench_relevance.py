@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for relevance.filter_relevant_jobs.
+
+Builds a synthetic DataFrame (50k rows by default) with realistic title and
+description lengths, runs the original row-by-row filter and the vectorized
+one, checks that both keep exactly the same rows and prints the timings.
+
+    python benchmarks/bench_relevance.py [--rows 50000] [--seed 7]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relevance import POSITIVE_KEYWORDS, NEGATIVE_TITLE_KEYWORDS, filter_relevant_jobs, explain_relevance
+
+FILLER_WORDS = (
+    "team patient hospital records compliance shift process review quality "
+    "audit billing support client remote office hybrid experience years "
+    "knowledge skills communication analyst associate senior junior lead"
+).split()
+
+TITLE_STEMS = [
+    "Medical Coder", "Inpatient Coding Specialist", "CDI Specialist",
+    "Clinical Documentation Improvement Associate", "HCC Risk Adjustment Coder",
+    "Software Engineer", "React Developer", "Data Scientist", "Customer Support",
+    "Accounts Executive", "Nurse", "Sales Manager", "Clinical Coder",
+]
+
+
+def make_jobs(rows, seed):
+    rng = random.Random(seed)
+    keywords = POSITIVE_KEYWORDS + NEGATIVE_TITLE_KEYWORDS
+    titles, descriptions = [], []
+    for _ in range(rows):
+        titles.append(f"{rng.choice(TITLE_STEMS)} {rng.choice(FILLER_WORDS).title()}")
+        words = rng.choices(FILLER_WORDS, k=rng.randint(150, 600))
+        if rng.random() < 0.4:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        descriptions.append(" ".join(words))
+
+    jobs = pd.DataFrame({"title": titles, "description": descriptions})
+    # A few missing values, as jobspy returns them
+    jobs.loc[jobs.sample(frac=0.02, random_state=seed).index, "description"] = None
+    return jobs
+
+
+def filter_rowwise(jobs_df, search_terms):
+    """
+    The original iterrows() implementation, kept as the reference.
+    """
+    kept_indices = []
+    for idx, row in jobs_df.iterrows():
+        title = str(row.get('title', '')).lower()
+        description = str(row.get('description', '')).lower()
+        combined_text = title + " " + description
+
+        if any(neg_kw in title for neg_kw in NEGATIVE_TITLE_KEYWORDS):
+            continue
+        if any(pos_kw in combined_text for pos_kw in POSITIVE_KEYWORDS) or \
+                any(term.lower() in title for term in search_terms):
+            kept_indices.append(idx)
+    return jobs_df.loc[kept_indices].reset_index(drop=True)
+
+
+def timed(label, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {elapsed:8.3f}s")
+    return result, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    search_terms = ["Medical coding", "Customer Support", "CDI Coding"]
+    jobs = make_jobs(args.rows, args.seed)
+    print(f"Synthetic jobs: {len(jobs)} rows, "
+          f"{jobs['description'].str.len().mean():.0f} chars/description on average\n")
+
+    expected, rowwise_time = timed("iterrows (original)", filter_rowwise, jobs, search_terms)
+    actual, vector_time = timed("vectorized", filter_relevant_jobs, jobs, search_terms)
+    _, explain_time = timed("explain_relevance", explain_relevance, jobs, search_terms)
+
+    if not expected.equals(actual):
+        sys.exit("❌ Vectorized filter disagrees with the original implementation")
+    print(f"\n✅ Same {len(actual)} rows kept; speedup x{rowwise_time / vector_time:.1f}")
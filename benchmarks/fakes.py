@@ -0,0 +1,293 @@
+"""
+Local stand-ins for the job bot's external services, for offline benchmarks:
+
+- FakeScraper: a scrape_jobs() replacement returning synthetic jobspy frames
+- FakeClient / FakeSpreadsheet / FakeWorksheet: an in-memory gspread subset
+- FakeSheetsSession: the real SheetsSession on top of FakeClient
+- make_fake_telegram_client(): a Telethon TelegramClient replacement
+
+Every fake takes a latency (seconds per call) so network cost can be
+simulated, and a data volume. The tests in tests/ use them too; the repo
+root must be on sys.path.
+"""
+import time
+import random
+import asyncio
+import hashlib
+import itertools
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+from gspread import WorksheetNotFound
+from sheets_session import SheetsSession
+
+FILLER_WORDS = (
+    "team patient hospital records compliance shift process review quality "
+    "audit billing support client remote office hybrid experience years "
+    "knowledge skills communication analyst associate senior junior lead"
+).split()
+
+RELEVANT_PHRASES = ["medical coding", "icd-10", "cdi", "inpatient coder", "hcc", "aapc", "ip-drg"]
+TITLES = [
+    "Medical Coder", "Inpatient Coding Specialist", "CDI Specialist", "Clinical Coder",
+    "HCC Risk Adjustment Coder", "Software Engineer", "React Developer", "Customer Support",
+]
+COMPANIES = ["Acme Health", "Omega RCM", "CarePoint", "MedScribe", "Nova Billing", "HealthFirst"]
+
+
+def _description_pool(size, chars, rng):
+    pool = []
+    for _ in range(size):
+        words, length = [], 0
+        while length < chars:
+            words.append(rng.choice(FILLER_WORDS))
+            length += len(words[-1]) + 1
+        if rng.random() < 0.7:
+            words.insert(rng.randrange(len(words)), rng.choice(RELEVANT_PHRASES))
+        pool.append(" ".join(words))
+    return pool
+
+
+class FakeScraper:
+    """
+    Drop-in for jobspy.scrape_jobs. Each call sleeps `latency` seconds and
+    returns `jobs_per_call` rows per site. About `overlap` of the postings
+    are shared between search terms (same job_url), like real boards, and
+    about `cross_post` are the same job listed on every board of the call
+    under a different job_url.
+    """
+
+    def __init__(self, jobs_per_call=20, latency=0.0, overlap=0.3, cross_post=0.2, description_chars=1500, seed=7):
+        self.jobs_per_call = jobs_per_call
+        self.latency = latency
+        self.overlap = overlap
+        self.cross_post = cross_post
+        self.seed = seed
+        self.calls = 0
+        rng = random.Random(seed)
+        self._descriptions = _description_pool(300, description_chars, rng)
+
+    def _posting(self, posting_key, hours_old):
+        rng = random.Random(f"{self.seed}|{posting_key}")
+        # A few posting-specific words so unrelated jobs never look identical
+        description = " ".join(rng.choices(FILLER_WORDS, k=60)) + " " + rng.choice(self._descriptions)
+        return {
+            "title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "date_posted": date.today() - timedelta(days=rng.randrange(max(1, hours_old // 24))),
+            "job_type": "fulltime",
+            "is_remote": rng.random() < 0.2,
+            "min_amount": None,
+            "max_amount": None,
+            "description": description,
+        }
+
+    def __call__(self, site_name, search_term, location, results_wanted=None, hours_old=72, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        key = f"{sorted(site_name)}|{search_term}|{location}"
+        rng = random.Random(f"{self.seed}|{key}")
+        rows = []
+        for i in range(self.jobs_per_call):
+            # Shared postings are keyed without the term so other terms find them too
+            if rng.random() < self.overlap:
+                posting_key = f"{location}|shared|{rng.randrange(self.jobs_per_call * 4)}"
+            else:
+                posting_key = f"{key}|{i}"
+            cross_posted = rng.random() < self.cross_post
+            for site in site_name:
+                site_key = posting_key if cross_posted or site == site_name[0] else f"{posting_key}|{site}"
+                job_id = hashlib.md5(f"{site}|{site_key}".encode()).hexdigest()[:12]
+                rows.append({
+                    "id": f"{site[:2]}-{job_id}",
+                    "site": site,
+                    "job_url": f"https://{site}.example/jobs/{job_id}",
+                    "location": f"{location}, India",
+                    **self._posting(site_key, hours_old),
+                })
+        return pd.DataFrame(rows)
+
+
+class FakeWorksheet:
+    """
+    In-memory subset of gspread.Worksheet used by main.py.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, title, latency=0.0):
+        self.title = title
+        self.id = next(self._ids)
+        self.latency = latency
+        self.rows = []
+        self.calls = 0
+
+    def _api(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def row_count(self):
+        return max(1000, len(self.rows))
+
+    @property
+    def col_count(self):
+        return max([20] + [len(r) for r in self.rows])
+
+    def add_cols(self, cols):
+        self._api()
+
+    def row_values(self, row):
+        self._api()
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def col_values(self, col):
+        self._api()
+        return [r[col - 1] if len(r) >= col else "" for r in self.rows]
+
+    def get_all_records(self):
+        self._api()
+        if not self.rows:
+            return []
+        headers = self.rows[0]
+        return [dict(zip(headers, r + [""] * (len(headers) - len(r)))) for r in self.rows[1:]]
+
+    def insert_row(self, values, index=1):
+        self._api()
+        self.rows.insert(index - 1, list(values))
+
+    def append_rows(self, values):
+        self._api()
+        self.rows.extend(list(v) for v in values)
+
+    def clear(self):
+        self._api()
+        self.rows = []
+
+    def update(self, values=None, range_name=None, **kwargs):
+        self._api()
+        if range_name == "A1" and self.rows:
+            self.rows[0] = list(values[0])
+        else:
+            self.rows = [list(v) for v in values]
+
+
+class FakeSpreadsheet:
+    """
+    In-memory subset of gspread.Spreadsheet: worksheets and row deletes.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.worksheets = {}
+
+    def _api(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def worksheet(self, title):
+        self._api()
+        if title not in self.worksheets:
+            raise WorksheetNotFound(title)
+        return self.worksheets[title]
+
+    def add_worksheet(self, title, rows=1000, cols=20):
+        self._api()
+        self.worksheets[title] = FakeWorksheet(title, self.latency)
+        return self.worksheets[title]
+
+    def batch_update(self, body):
+        self._api()
+        by_id = {ws.id: ws for ws in self.worksheets.values()}
+        for request in body["requests"]:
+            rng = request["deleteDimension"]["range"]
+            del by_id[rng["sheetId"]].rows[rng["startIndex"]:rng["endIndex"]]
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+
+class FakeSheetsSession(SheetsSession):
+    """
+    The real SheetsSession (caching, timing, retries) on top of a fake client.
+    """
+
+    def __init__(self, spreadsheet):
+        super().__init__("fake_credentials.json", "fake-sheet-id")
+        self._fake_spreadsheet = spreadsheet
+
+    def _authorize(self):
+        self._client = FakeClient(self._fake_spreadsheet)
+
+
+class FakeMessage:
+    def __init__(self, message_id, when, text):
+        self.id = message_id
+        self.date = when
+        self.text = text
+
+
+class FakeDialog:
+    def __init__(self, dialog_id, name):
+        self.id = dialog_id
+        self.name = name
+        self.username = f"channel{dialog_id}"
+        self.is_channel = True
+        self.is_group = False
+
+
+def make_fake_telegram_client(channels=20, messages_per_channel=200, latency=0.0, match_rate=0.1, seed=7):
+    """
+    Returns a TelegramClient replacement class whose account is in `channels`
+    channels of `messages_per_channel` messages each (newest first, about one
+    per 15 minutes). `latency` is paid per 100 messages, like Telethon's
+    GetHistory batches.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    history = {}
+    for channel_id in range(1, channels + 1):
+        messages = []
+        for i in range(messages_per_channel):
+            text = " ".join(rng.choices(FILLER_WORDS, k=40))
+            if rng.random() < match_rate:
+                text += " hiring: " + rng.choice(["Medical coding", "CDI specialist", "Inpatient coder", "CDIP"])
+            message_id = messages_per_channel - i
+            messages.append(FakeMessage(message_id, now - timedelta(minutes=15 * i), text))
+        history[channel_id] = messages
+
+    class FakeTelegramClient:
+        def __init__(self, session, api_id, api_hash):
+            pass
+
+        async def __aenter__(self):
+            if latency:
+                await asyncio.sleep(latency)
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def iter_dialogs(self):
+            for channel_id in history:
+                yield FakeDialog(channel_id, f"Jobs Channel {channel_id}")
+
+        async def iter_messages(self, entity, limit=None, min_id=0):
+            for count, message in enumerate(history[entity.id]):
+                if limit is not None and count >= limit:
+                    return
+                if message.id <= min_id:
+                    return
+                if latency and count % 100 == 0:
+                    await asyncio.sleep(latency)
+                yield message
+
+    return FakeTelegramClient
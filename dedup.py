@@ -0,0 +1,267 @@
+import re
+import zlib
+import numpy as np
+import pandas as pd
+
+# Jaccard similarity (estimated from MinHash signatures) above which two
+# postings of the same company, city and title are treated as one job
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 64
+SHINGLE_WORDS = 3
+_GRAM_MULTIPLIER = 1_000_003
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(1)
+# a < 2**31 and 32-bit shingle hashes keep a * x + b inside uint64
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+# Legal suffixes and filler that differ between boards for the same employer
+COMPANY_STOPWORDS = {
+    "pvt", "private", "ltd", "limited", "llp", "llc", "inc", "corp", "corporation",
+    "co", "company", "india", "the", "and",
+}
+TITLE_STOPWORDS = {"urgent", "hiring", "opening", "openings", "for", "immediate", "joiners", "job", "the"}
+
+
+def _words(text):
+    if not isinstance(text, str):
+        text = "" if pd.isna(text) else str(text)
+    return _NON_WORD.sub(" ", text.lower()).split()
+
+
+def normalize_company(company):
+    return " ".join(word for word in _words(company) if word not in COMPANY_STOPWORDS)
+
+
+def normalize_title(title):
+    return " ".join(word for word in _words(title) if word not in TITLE_STOPWORDS)
+
+
+def normalize_location(location):
+    # Boards disagree on state/country suffixes; the city decides the job
+    city = str(location).split(",")[0] if isinstance(location, str) else ""
+    return " ".join(_words(city))
+
+
+def shingles(title, description, size=SHINGLE_WORDS):
+    """
+    32-bit hashes of the description's word n-grams plus the normalized
+    title's words. N-gram hashes are combined from word hashes with numpy
+    rather than by joining strings.
+    """
+    words = _words(description)
+    word_hashes = np.array([zlib.crc32(word.encode()) for word in words], dtype=np.uint64)
+    if len(word_hashes) >= size:
+        grams = np.zeros(len(word_hashes) - size + 1, dtype=np.uint64)
+        for offset in range(size):
+            grams = (grams * np.uint64(_GRAM_MULTIPLIER) + word_hashes[offset:len(word_hashes) - size + 1 + offset]) & np.uint64(0xFFFFFFFF)
+    else:
+        grams = word_hashes
+    title_hashes = np.array([zlib.crc32(f"title:{word}".encode()) for word in normalize_title(title).split()], dtype=np.uint64)
+    return np.unique(np.concatenate([grams, title_hashes]))
+
+
+def minhash(hashes):
+    """
+    MinHash signature (NUM_PERM values) of a non-empty set of 32-bit
+    shingle hashes.
+    """
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+
+def lsh_bands(threshold, num_perm=NUM_PERM):
+    """
+    Picks (bands, rows per band) so pairs around `threshold` become
+    candidates: the LSH S-curve is steepest near (1 / bands) ** (1 / rows).
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        # The earlier row stays the root, so it becomes the canonical row
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+FINGERPRINT_COLUMN = "_fingerprint"
+
+
+def fingerprints(jobs_df):
+    """
+    (block, MinHash signature) per row, used to find near-duplicates within
+    the rows and against postings stored by earlier runs. Rows without a
+    company or without any text get None instead.
+    """
+    def column(name):
+        return jobs_df[name].tolist() if name in jobs_df.columns else [""] * len(jobs_df)
+
+    result = []
+    # Copies of one posting usually have the exact same text
+    by_text = {}
+    for company, location, title, description in zip(column("company"), column("location"),
+                                                     column("title"), column("description")):
+        block = block_key(company, location, title)
+        if block is None:
+            result.append(None)
+            continue
+        text = (title, description)
+        if text not in by_text:
+            hashes = shingles(*text)
+            by_text[text] = minhash(hashes) if len(hashes) else None
+        result.append((block, by_text[text]) if by_text[text] is not None else None)
+    return result
+
+
+def find_near_duplicates(jobs_df, threshold=DEFAULT_THRESHOLD, entries=None):
+    """
+    Groups rows that are the same posting listed under different URLs.
+    Rows are only compared within a (company, city, title) block and, inside a
+    block, only when their MinHash signatures share an LSH band, so the
+    cost grows roughly linearly with the number of rows. `entries` are the
+    rows' fingerprints() when already computed.
+    Returns {canonical position: [(duplicate position, similarity), ...]}
+    where positions are 0-based row numbers and canonical is the earliest.
+    """
+    if jobs_df.empty or "company" not in jobs_df.columns:
+        return {}
+
+    entries = fingerprints(jobs_df) if entries is None else entries
+    blocks = {}
+    # Rows with no text at all are never merged
+    for position, entry in enumerate(entries):
+        if entry is not None:
+            blocks.setdefault(entry[0], {})[position] = entry[1]
+
+    bands, rows = lsh_bands(threshold)
+    union = _UnionFind(len(jobs_df))
+    similarity = {}
+
+    for signatures in blocks.values():
+        if len(signatures) < 2:
+            continue
+        buckets = {}
+        for position, signature in signatures.items():
+            for band in range(bands):
+                buckets.setdefault((band, signature[band * rows:(band + 1) * rows].tobytes()), []).append(position)
+
+        checked = set()
+        for candidates in buckets.values():
+            for i, first in enumerate(candidates):
+                for second in candidates[i + 1:]:
+                    if (first, second) in checked or union.find(first) == union.find(second):
+                        continue
+                    checked.add((first, second))
+                    score = float(np.mean(signatures[first] == signatures[second]))
+                    if score >= threshold:
+                        union.union(first, second)
+                        similarity[second] = max(similarity.get(second, 0.0), score)
+
+    groups = {}
+    for position in range(len(jobs_df)):
+        root = union.find(position)
+        if root != position:
+            groups.setdefault(root, []).append((position, similarity.get(position, threshold)))
+    return groups
+
+
+def collapse_near_duplicates(jobs_df, threshold=DEFAULT_THRESHOLD):
+    """
+    Keeps one canonical row per group of near-duplicate postings and lists
+    the other copies' URLs in its `alternate_urls` column. Each kept row's
+    fingerprint is left in FINGERPRINT_COLUMN, so the signatures are not
+    computed again to compare the rows with earlier runs.
+    Returns (deduplicated DataFrame, merge report rows).
+    """
+    entries = fingerprints(jobs_df)
+    groups = find_near_duplicates(jobs_df, threshold, entries)
+    jobs_df = jobs_df.assign(**{FINGERPRINT_COLUMN: pd.Series(entries, index=jobs_df.index, dtype=object)})
+    if not groups:
+        return jobs_df, []
+
+    urls = jobs_df["job_url"].astype(str).tolist()
+    sites = jobs_df["site"].astype(str).tolist() if "site" in jobs_df.columns else [""] * len(jobs_df)
+    alternates = pd.Series("", index=jobs_df.index, dtype=object)
+    duplicates = []
+    report = []
+    for canonical, members in groups.items():
+        alternates.iloc[canonical] = ", ".join(urls[position] for position, _ in members)
+        duplicates.extend(position for position, _ in members)
+        report.append({
+            "canonical_url": urls[canonical],
+            "title": jobs_df["title"].iloc[canonical] if "title" in jobs_df.columns else "",
+            "company": jobs_df["company"].iloc[canonical],
+            "sites": [sites[canonical]] + [sites[position] for position, _ in members],
+            "merged": [{"job_url": urls[position], "site": sites[position], "similarity": round(score, 3)}
+                       for position, score in members],
+        })
+
+    keep = np.ones(len(jobs_df), dtype=bool)
+    keep[duplicates] = False
+    deduped = jobs_df.assign(alternate_urls=alternates)[keep].reset_index(drop=True)
+    return deduped, report
+
+
+def block_key(company, location, title):
+    """
+    The (company, city, title) block a posting is compared within, as one
+    string, or None when the company is unknown. The title is part of the
+    block because an employer's postings often share most of their text
+    (an "About us" section, benefits), which alone would make different
+    roles look like copies of one job.
+    """
+    company = normalize_company(company)
+    return f"{company}|{normalize_location(location)}|{normalize_title(title)}" if company else None
+
+
+def match_fingerprints(entries, known, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares fingerprints (as returned by fingerprints()) with `known`,
+    {block: [(job_url, signature bytes), ...]} as stored by the job store.
+    Blocks hold few postings, so each entry is checked against all of its
+    block's signatures at once.
+    Returns {position: (job_url, similarity)} for entries at least
+    `threshold` similar to a known posting.
+    """
+    stacked = {block: ([url for url, _ in members], np.vstack([np.frombuffer(signature, dtype=np.uint64) for _, signature in members]))
+               for block, members in known.items() if members}
+    matches = {}
+    for position, entry in enumerate(entries):
+        if entry is None or entry[0] not in stacked:
+            continue
+        urls, signatures = stacked[entry[0]]
+        scores = (signatures == entry[1]).mean(axis=1)
+        best = int(scores.argmax())
+        if scores[best] >= threshold:
+            matches[position] = (urls[best], float(scores[best]))
+    return matches
+
+
+def print_dedup_report(sheet_name, report, limit=10):
+    """
+    Prints which postings were merged as cross-site duplicates.
+    """
+    if not report:
+        return
+    merged = sum(len(group["merged"]) for group in report)
+    print(f"🧬 Merged {merged} near-duplicate postings into {len(report)} jobs for '{sheet_name}':")
+    for group in report[:limit]:
+        print(f"   {str(group['title'])[:40]:<40} @ {str(group['company'])[:25]:<25} "
+              f"sites={'/'.join(group['sites'])} "
+              f"similarity={min(m['similarity'] for m in group['merged']):.2f}")
+    if len(report) > limit:
+        print(f"   ... and {len(report) - limit} more")
@@ -0,0 +1,90 @@
+import os
+import time
+import threading
+
+# Helpers shared by the file-per-entry caches (scrape_cache.ScrapeCache,
+# social_bot/content_cache.ContentCache and the image cache in
+# social_bot/design_engine.py). An entry's mtime is when it was written and
+# drives the TTL; its atime is when it was last read and drives LRU eviction.
+
+
+def expired(path, ttl_seconds):
+    """
+    True if the entry at `path` was written more than `ttl_seconds` ago.
+    Raises FileNotFoundError if there is no entry.
+    """
+    return time.time() - os.path.getmtime(path) > ttl_seconds
+
+
+def touch(path):
+    """
+    Records a read of the entry for LRU eviction without touching its
+    mtime (TTL).
+    """
+    os.utime(path, (time.time(), os.path.getmtime(path)))
+
+
+def write_atomic(path, write):
+    """
+    Calls write(tmp_path) and moves the result into place, so readers
+    never see a partial entry. The temporary file is removed if writing
+    fails, and the error is raised.
+    """
+    # Unique per process and thread, so concurrent writers of one entry do not collide
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_quietly(tmp_path)
+        raise
+
+
+def evict(cache_dir, suffix, ttl_seconds=None, max_bytes=None, max_entries=None):
+    """
+    Removes the entries (files ending in `suffix`, a string or a tuple of
+    them) of `cache_dir` written more than `ttl_seconds` ago, then the least
+    recently used ones until the rest fit in `max_bytes` and `max_entries`.
+    Limits left as None are not applied. Returns the number of entries
+    removed.
+    """
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        return 0
+
+    now = time.time()
+    removed = 0
+    entries = []
+    for name in names:
+        if not name.endswith(suffix):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if ttl_seconds is not None and now - stat.st_mtime > ttl_seconds:
+            remove_quietly(path)
+            removed += 1
+            continue
+        entries.append((stat.st_atime, stat.st_size, path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    count = len(entries)
+    for _, size, path in entries:
+        if (max_bytes is None or total <= max_bytes) and (max_entries is None or count <= max_entries):
+            break
+        remove_quietly(path)
+        removed += 1
+        total -= size
+        count -= 1
+    return removed
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
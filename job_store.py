@@ -0,0 +1,232 @@
+import os
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+# Membership states of a job in a sheet:
+#   pending  - stored locally, not yet appended to the sheet
+#   synced   - present in the sheet
+#   expiring - too old; still in the sheet, to be deleted on the next sync
+#   expired  - gone from the sheet; kept so the job is not added again
+ACTIVE_STATES = ("pending", "synced")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_url     TEXT PRIMARY KEY,
+    date_posted TEXT,
+    first_seen  TEXT NOT NULL,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_date_posted ON jobs(date_posted);
+
+CREATE TABLE IF NOT EXISTS sheet_jobs (
+    sheet_name TEXT NOT NULL,
+    job_url    TEXT NOT NULL REFERENCES jobs(job_url),
+    status     TEXT NOT NULL,
+    added_at   TEXT NOT NULL,
+    PRIMARY KEY (sheet_name, job_url)
+);
+CREATE INDEX IF NOT EXISTS idx_sheet_jobs_status ON sheet_jobs(sheet_name, status);
+
+-- Near-duplicate fingerprints of a sheet's jobs (see dedup.fingerprints),
+-- so a copy of a job posted under another URL in a later run is not added
+-- again. Alternate URLs of a collapsed job are stored with its fingerprint
+-- and point to it through canonical_url.
+CREATE TABLE IF NOT EXISTS fingerprints (
+    sheet_name    TEXT NOT NULL,
+    job_url       TEXT NOT NULL,
+    canonical_url TEXT NOT NULL,
+    block         TEXT NOT NULL,
+    signature     BLOB NOT NULL,
+    PRIMARY KEY (sheet_name, job_url)
+);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_block ON fingerprints(sheet_name, block);
+"""
+
+# YYYY-MM-DD; other date_posted values ("Just now", empty) never expire
+DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+
+class JobStore:
+    """
+    Local SQLite store of every job written to the sheets. It is the source
+    of truth for duplicate detection and expiry; Google Sheets only receives
+    the resulting row diffs (see sheet_sync.sync_sheet).
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def has_sheet(self, sheet_name):
+        row = self.conn.execute("SELECT 1 FROM sheet_jobs WHERE sheet_name = ? LIMIT 1", (sheet_name,)).fetchone()
+        return row is not None
+
+    def add_jobs(self, sheet_name, rows, status="pending"):
+        """
+        Stores jobs (dicts of column -> str) and adds them to `sheet_name`.
+        Rows without a job_url or already known for this sheet are ignored.
+        Returns the number of jobs new to the sheet.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = [row for row in rows if str(row.get("job_url", ""))]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO jobs (job_url, date_posted, first_seen, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(job_url) DO NOTHING",
+                [(str(row["job_url"]), str(row.get("date_posted", "")), now, json.dumps(row)) for row in rows],
+            )
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT INTO sheet_jobs (sheet_name, job_url, status, added_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(sheet_name, job_url) DO NOTHING",
+                [(sheet_name, str(row["job_url"]), status, now) for row in rows],
+            )
+            return self.conn.total_changes - before
+
+    def _select_in(self, query, sheet_name, values):
+        # Stay under SQLite's limit on bound parameters
+        values = list(dict.fromkeys(str(value) for value in values))
+        for start in range(0, len(values), 500):
+            batch = values[start:start + 500]
+            yield from self.conn.execute(query.format(", ".join("?" for _ in batch)), (sheet_name, *batch))
+
+    def known_urls(self, sheet_name, urls):
+        """
+        The subset of `urls` already in the sheet, in any state.
+        """
+        return {url for (url,) in self._select_in(
+            "SELECT job_url FROM sheet_jobs WHERE sheet_name = ? AND job_url IN ({})", sheet_name, urls
+        )}
+
+    def alternate_urls(self, sheet_name, urls):
+        """
+        {url: canonical job_url} for the `urls` stored as alternate URLs of
+        one of the sheet's jobs.
+        """
+        return dict(self._select_in(
+            "SELECT job_url, canonical_url FROM fingerprints "
+            "WHERE sheet_name = ? AND job_url IN ({}) AND job_url != canonical_url", sheet_name, urls
+        ))
+
+    def add_fingerprints(self, sheet_name, entries):
+        """
+        Stores (job_url, canonical_url, block, signature bytes) entries for
+        `sheet_name`; URLs that already have one keep it.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO fingerprints (sheet_name, job_url, canonical_url, block, signature) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(sheet_name, job_url) DO NOTHING",
+                [(sheet_name, *entry) for entry in entries],
+            )
+
+    def fingerprints(self, sheet_name, blocks):
+        """
+        {block: [(job_url, signature bytes), ...]} of the sheet's jobs in
+        `blocks`, one entry per job.
+        """
+        known = {}
+        for block, url, signature in self._select_in(
+            "SELECT block, job_url, signature FROM fingerprints "
+            "WHERE sheet_name = ? AND block IN ({}) AND job_url = canonical_url", sheet_name, blocks
+        ):
+            known.setdefault(block, []).append((url, signature))
+        return known
+
+    def expire(self, sheet_name, hours_old, today=None):
+        """
+        Marks jobs posted more than `hours_old` hours ago (by date) for
+        removal. Returns the number of jobs newly marked.
+        """
+        today = today or datetime.now().date()
+        # age_days * 24 > hours_old  <=>  date_posted < today - hours_old // 24 days
+        cutoff = (today - timedelta(days=hours_old // 24)).isoformat()
+        old_jobs = "SELECT job_url FROM jobs WHERE date_posted GLOB ? AND date_posted < ?"
+        with self.conn:
+            # Never written to the sheet: nothing to delete there
+            unsynced = self.conn.execute(
+                f"UPDATE sheet_jobs SET status = 'expired' WHERE sheet_name = ? AND status = 'pending' "
+                f"AND job_url IN ({old_jobs})",
+                (sheet_name, DATE_GLOB, cutoff),
+            ).rowcount
+            synced = self.conn.execute(
+                f"UPDATE sheet_jobs SET status = 'expiring' WHERE sheet_name = ? AND status = 'synced' "
+                f"AND job_url IN ({old_jobs})",
+                (sheet_name, DATE_GLOB, cutoff),
+            ).rowcount
+        return unsynced + synced
+
+    def _urls(self, sheet_name, status):
+        return [url for (url,) in self.conn.execute(
+            "SELECT job_url FROM sheet_jobs WHERE sheet_name = ? AND status = ?", (sheet_name, status)
+        )]
+
+    def _rows(self, sheet_name, statuses):
+        placeholders = ", ".join("?" for _ in statuses)
+        return [json.loads(data) for (data,) in self.conn.execute(
+            f"SELECT j.data FROM sheet_jobs s JOIN jobs j ON j.job_url = s.job_url "
+            f"WHERE s.sheet_name = ? AND s.status IN ({placeholders}) ORDER BY s.rowid",
+            (sheet_name, *statuses),
+        )]
+
+    def pending_rows(self, sheet_name):
+        """
+        Jobs waiting to be appended to the sheet, in insertion order.
+        """
+        return self._rows(sheet_name, ("pending",))
+
+    def active_rows(self, sheet_name):
+        """
+        Every job that belongs in the sheet right now (used to rebuild it).
+        """
+        return self._rows(sheet_name, ACTIVE_STATES)
+
+    def synced_urls(self, sheet_name):
+        return set(self._urls(sheet_name, "synced"))
+
+    def expiring_urls(self, sheet_name):
+        return set(self._urls(sheet_name, "expiring"))
+
+    def _set_status(self, sheet_name, urls, status):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE sheet_jobs SET status = ? WHERE sheet_name = ? AND job_url = ?",
+                [(status, sheet_name, url) for url in urls],
+            )
+
+    def mark_synced(self, sheet_name, urls):
+        self._set_status(sheet_name, urls, "synced")
+
+    def mark_removed(self, sheet_name, urls):
+        self._set_status(sheet_name, urls, "expired")
+
+    def mark_all_active_synced(self, sheet_name):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE sheet_jobs SET status = 'synced' WHERE sheet_name = ? AND status = 'pending'", (sheet_name,)
+            )
+
+    def prune(self, keep_days=30):
+        """
+        Forgets expired jobs first seen more than `keep_days` ago, along
+        with their fingerprints.
+        """
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM sheet_jobs WHERE status = 'expired' AND job_url IN "
+                "(SELECT job_url FROM jobs WHERE first_seen < ?)", (cutoff,)
+            )
+            self.conn.execute(
+                "DELETE FROM jobs WHERE first_seen < ? AND job_url NOT IN (SELECT job_url FROM sheet_jobs)", (cutoff,)
+            )
+            self.conn.execute(
+                "DELETE FROM fingerprints WHERE NOT EXISTS (SELECT 1 FROM sheet_jobs s "
+                "WHERE s.sheet_name = fingerprints.sheet_name AND s.job_url = fingerprints.canonical_url)"
+            )
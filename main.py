@@ -4,10 +4,27 @@ import pandas as pd
 from jobspy import scrape_jobs
 from datetime import datetime, timedelta
 import os
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from telegram_scraper import scrape_telegram_jobs
+from sheets_session import SheetsSession
+from job_store import JobStore
+import sheet_sync
+from telegram_scraper import scrape_telegram_jobs, load_high_water_marks, save_high_water_marks
+from scheduler import ScrapeTask, iter_grid, print_timing_report
+from scrape_cache import ScrapeCache
+from scrape_window import ScrapeWindow
+from seen_urls import SeenUrls
+from shard_artifacts import parse_shard, write_shard, read_shards
+from relevance import filter_relevant_jobs
+from resilience import get_backend, print_resilience_report, backend_stats
+from run_metrics import METRICS
+from dedup import collapse_near_duplicates, match_fingerprints, print_dedup_report, FINGERPRINT_COLUMN
+from query_planner import normalize_term, plan_queries, distinct_queries, merge_term_results, print_term_report
 import asyncio
+import argparse
+import functools
+import dataclasses
+import hashlib
+import json
+import time
 
 # --- Configuration ---
 SHEET_ID = "1-RhzHDWvh2nctnjNzHTaRZ-7A5G5fKZA4OPtGjLzki8"
@@ -15,10 +32,79 @@ LOCATIONS = ["Hyderabad", "Chennai", "Bangalore"]
 RESULTS_WANTED = 20
 HOURS_OLD = 72 
 
+# Local cache of raw scrape results so a rerun shortly after a failure
+# (e.g. a Sheets error) does not repeat the whole scrape.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+SCRAPE_CACHE_TTL_HOURS = 12
+SCRAPE_CACHE_MAX_MB = 200
+
+# hours_old is chosen per (term, site group) from the last run in which
+# that scrape succeeded, plus an overlap for postings indexed late, up to
+# HOURS_OLD. URLs ingested by earlier runs are dropped before filtering;
+# they are remembered for one to two HOURS_OLD periods.
+SCRAPE_WINDOW_PATH = os.path.join(CACHE_DIR, "scrape_window.json")
+SCRAPE_WINDOW_OVERLAP_HOURS = 6
+SEEN_URLS_PATH = os.path.join(CACHE_DIR, "seen_urls.bloom")
+
+# Job board groups scraped per (term, location). Each group runs in its own
+# worker pool capped at `max_concurrency` parallel scrape_jobs calls and is
+# rate-limited to `requests_per_minute`. LinkedIn rate-limits aggressively,
+# so keep it at 1. A group failing `failure_threshold` times in a row is
+# skipped for the rest of the run.
+SITE_GROUPS = [
+    {"sites": ["indeed", "glassdoor", "naukri"], "name": "Standard", "max_concurrency": 3,
+     "requests_per_minute": 30, "failure_threshold": 4},
+    {"sites": ["linkedin"], "name": "LinkedIn", "max_concurrency": 1,
+     "requests_per_minute": 6, "failure_threshold": 3},
+]
+
 # Configuration for Telegram
 TELEGRAM_API_ID = os.environ.get("TELEGRAM_API_ID")
 TELEGRAM_API_HASH = os.environ.get("TELEGRAM_API_HASH")
 TELEGRAM_SESSION_STRING = os.environ.get("TELEGRAM_SESSION_STRING")
+# Last seen message id per channel, so each run only reads new messages
+TELEGRAM_STATE_PATH = os.path.join(CACHE_DIR, "telegram_state.json")
+# Columns scrape_telegram_jobs adds for routing; they are not written to sheets
+TELEGRAM_ROUTING_COLUMNS = ["search_term", "sheet_name"]
+
+# Machine-readable report of the last run (stage timings, rows, API calls)
+RUN_REPORT_PATH = os.path.join(CACHE_DIR, "run_report.json")
+
+# One authorized Google Sheets session shared by every sheet operation
+SHEETS = SheetsSession(os.path.join(os.path.dirname(__file__), "google_credentials.json"), SHEET_ID)
+
+# Local SQLite store of every job written to the sheets: duplicates and
+# expiry are resolved here and only the diff is pushed to Google Sheets
+JOB_STORE_PATH = os.path.join(CACHE_DIR, "jobs.sqlite")
+_JOB_STORE = None
+
+# Columns written to the sheets. Everything else jobspy returns (company
+# logos, addresses, long company descriptions) is dropped as soon as a batch
+# has been filtered.
+SHEET_COLUMNS = [
+    "id", "site", "job_url", "job_url_direct", "title", "company", "location", "date_posted",
+    "job_type", "salary_source", "interval", "min_amount", "max_amount", "currency", "is_remote",
+    "job_level", "job_function", "experience_range", "skills", "emails", "company_industry",
+    "company_url", "description",
+]
+
+# Raw scrape batches are held per sheet until this many rows have arrived
+# and then filtered together: peak memory is bounded by this, not by the
+# size of the whole scrape, while each filter call stays large enough to
+# amortize its regex setup
+FILTER_BATCH_ROWS = 2000
+# The same posting is often listed on several boards under different URLs.
+# Postings of the same company, city and title whose descriptions (MinHash over
+# word shingles) are at least this similar are collapsed into one row that
+# lists the other copies in `alternate_urls`. Above 1 disables it.
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# Grid position of every row, so batches (and shards) can be merged in a fixed order
+ORDER_COLUMNS = ["_term_order", "_shard_order", "_task_order"]
+
+# Sharded runs (--shard i/N, --terms, --locations) write their filtered
+# results here; `--merge DIR` dedups them and writes the sheets once
+SHARD_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shards")
 
 # List of search configurations: (Search Term, Sheet Name)
 SEARCH_CONFIGS = [
@@ -43,293 +129,643 @@ SEARCH_CONFIGS = [
 ]
 
 def connect_to_sheet(sheet_name):
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds_file = os.path.join(os.path.dirname(__file__), "google_credentials.json")
-    
-    if not os.path.exists(creds_file):
-        raise FileNotFoundError(f"Credentials file not found at {creds_file}")
-        
-    creds = ServiceAccountCredentials.from_json_keyfile_name(creds_file, scope)
-    client = gspread.authorize(creds)
-    spreadsheet = client.open_by_key(SHEET_ID)
-    
-    try:
-        worksheet = spreadsheet.worksheet(sheet_name)
-    except gspread.WorksheetNotFound:
-        print(f"Worksheet '{sheet_name}' not found. Creating it...")
-        worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
-        
-    return worksheet
+    """
+    Returns the worksheet handle from the shared Sheets session, which
+    authorizes and opens the spreadsheet only once per run.
+    """
+    return SHEETS.worksheet(sheet_name)
+
+def get_job_store():
+    """
+    Opens the local job store on first use.
+    """
+    global _JOB_STORE
+    if _JOB_STORE is None:
+        _JOB_STORE = JobStore(JOB_STORE_PATH)
+    return _JOB_STORE
+
+def import_sheet(sheet_name):
+    """
+    Seeds the job store from the sheet's current rows. Used the first time a
+    sheet is seen (or after the store was lost), so existing rows count as
+    duplicates and old ones still expire.
+    """
+    sheet = connect_to_sheet(sheet_name)
+    records = sheet.get_all_records()
+    imported = get_job_store().add_jobs(sheet_name, records, status="synced")
+    print(f"📥 Imported {imported} existing rows from '{sheet_name}' into the job store.")
 
 def remove_expired_jobs(sheet_name):
     """
-    Removes jobs from the sheet that are older than HOURS_OLD.
+    Marks jobs older than HOURS_OLD for removal in the job store.
+    The rows are deleted from the sheet by the next sync_sheet().
     """
     print(f"🧹 Clearing expired jobs from '{sheet_name}' (> {HOURS_OLD} hours old)...")
-    try:
-        sheet = connect_to_sheet(sheet_name)
-        data = sheet.get_all_records()
-        
-        if not data:
-            print("   -> Sheet is empty, nothing to clean.")
-            return
-
-        headers = sheet.row_values(1)
-        if 'date_posted' not in headers:
-            print("   -> Cannot clean: 'date_posted' column missing.")
-            return
-
-        # We need to preserve the header row
-        valid_rows = [headers]
-        deleted_count = 0
-        
-        today = datetime.now().date()
-        
-        for row in data:
-            date_str = str(row.get('date_posted', ''))
-            is_expired = False
-            
-            # Attempt to parse date
-            # JobSpy usually returns YYYY-MM-DD
-            try:
-                job_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                age_days = (today - job_date).days
-                if age_days * 24 > HOURS_OLD:
-                    is_expired = True
-            except ValueError:
-                # If date format is weird (e.g. "Just now" or empty), we KEEP it to be safe
-                pass
-            
-            if not is_expired:
-                valid_rows.append(list(row.values()))
-            else:
-                deleted_count += 1
-        
-        if deleted_count > 0:
-            print(f"   -> Removing {deleted_count} expired rows...")
-            sheet.clear()
-            sheet.update(valid_rows)
-            print("   -> Cleanup complete.")
-        else:
-            print("   -> No expired jobs found.")
+    with METRICS.stage("remove_expired_jobs", sheet=sheet_name) as stage:
+        expired = get_job_store().expire(sheet_name, HOURS_OLD)
+        stage["rows_out"] = expired
+    if expired:
+        print(f"   -> {expired} expired jobs marked for removal.")
+    else:
+        print("   -> No expired jobs found.")
+    return expired
 
-    except Exception as e:
-        print(f"   ❌ Error during cleanup: {e}")
-
-# --- Relevance Filter ---
-# Positive keywords: at least ONE must appear in the job title or description
-POSITIVE_KEYWORDS = [
-    "medical coding", "medical coder",
-    "inpatient coding", "inpatient coder",
-    "ip-drg", "ip drg", "drg coding", "drg coder",
-    "clinical coding", "clinical coder",
-    "clinical documentation", "cdi", "cdip",
-    "hcc", "risk adjustment",
-    "icd-10", "icd 10", "icd10",
-    "cpc", "ccs",
-    "ahima", "aapc",
-    "health information management", "him ",
-    "revenue cycle",
-    "outpatient coding", "outpatient coder",
-    "diagnosis coding", "procedure coding",
-    "coding specialist", "coding analyst",
-    "coding auditor", "coding educator",
-    "chart review", "medical record",
-]
+def sync_sheet(sheet_name):
+    """
+    Pushes the job store's net changes for `sheet_name` to the sheet (see
+    sheet_sync.sync_sheet).
+    """
+    sheet_sync.sync_sheet(SHEETS, get_job_store(), sheet_name)
 
-# Negative keywords: if ANY appears in the job TITLE, the job is excluded
-NEGATIVE_TITLE_KEYWORDS = [
-    "software engineer", "software developer", "software development",
-    "web developer", "frontend", "front-end", "backend", "back-end",
-    "full stack", "fullstack", "full-stack",
-    "devops", "data engineer", "data scientist",
-    "machine learning", "ml engineer", "ai engineer",
-    "python developer", "java developer", "javascript",
-    "react", "angular", "node.js", "vue.js",
-    "cloud engineer", "sre", "site reliability",
-    "qa engineer", "test engineer", "automation engineer",
-    "embedded", "firmware", "hardware engineer",
-    "mechanical engineer", "civil engineer", "electrical engineer",
-    "network engineer", "system administrator", "sysadmin",
-    "cybersecurity", "information security",
-    "database administrator", "dba",
-    "ui/ux", "ux designer", "ui designer",
-    "product manager", "scrum master",
-    "blockchain", "crypto",
-]
+def rebuild_sheet(sheet_name):
+    """
+    Rewrites a sheet from the job store, e.g. after manual edits.
+    """
+    sheet_sync.rebuild_sheet(SHEETS, get_job_store(), sheet_name)
 
-def filter_relevant_jobs(jobs_df, search_term):
+def build_scrape_tasks(search_terms, locations=None, window=None):
     """
-    Filters a DataFrame of jobs to keep only healthcare coding/CDI relevant results.
-    Uses positive keyword matching + negative keyword exclusion on title.
+    Expands search terms into the (term, location, site group) scrape grid,
+    with hours_old taken from `window` (a ScrapeWindow) when given.
     """
-    if jobs_df.empty:
-        return jobs_df
-    
-    original_count = len(jobs_df)
-    kept_indices = []
-    
-    for idx, row in jobs_df.iterrows():
-        title = str(row.get('title', '')).lower()
-        description = str(row.get('description', '')).lower()
-        combined_text = title + " " + description
-        
-        # Step 1: Check if title contains any negative (engineering) keyword
-        is_engineering = False
-        for neg_kw in NEGATIVE_TITLE_KEYWORDS:
-            if neg_kw in title:
-                is_engineering = True
-                break
-        
-        if is_engineering:
-            continue
-        
-        # Step 2: Check if title or description contains at least one positive keyword
-        has_positive = False
-        for pos_kw in POSITIVE_KEYWORDS:
-            if pos_kw in combined_text:
-                has_positive = True
-                break
-        
-        # Also accept if the original search term itself is in the title
-        if not has_positive:
-            if search_term.lower() in title:
-                has_positive = True
-        
-        if has_positive:
-            kept_indices.append(idx)
-    
-    filtered_df = jobs_df.loc[kept_indices].reset_index(drop=True)
-    removed_count = original_count - len(filtered_df)
-    
-    if removed_count > 0:
-        print(f"   🔍 Relevance filter: Kept {len(filtered_df)}/{original_count} jobs ({removed_count} irrelevant removed)")
-    else:
-        print(f"   🔍 Relevance filter: All {original_count} jobs are relevant")
-    
-    return filtered_df
+    locations = LOCATIONS if locations is None else locations
+    return [
+        ScrapeTask(
+            term=term, location=location, group=config["name"], sites=tuple(config["sites"]),
+            hours_old=window.hours_old(term, config["name"]) if window is not None else HOURS_OLD,
+        )
+        for term in search_terms
+        for location in locations
+        for config in SITE_GROUPS
+    ]
 
+def site_group_backend(group_name):
+    """
+    Rate limiter, retries and circuit breaker shared by one site group's scrapes.
+    """
+    config = next(config for config in SITE_GROUPS if config["name"] == group_name)
+    return get_backend(
+        f"jobspy:{group_name}",
+        rate=config["requests_per_minute"] / 60,
+        burst=config["max_concurrency"],
+        max_attempts=3,
+        base_delay=5.0,
+        failure_threshold=config["failure_threshold"],
+    )
 
-def fetch_jobs(search_term):
-    all_jobs = pd.DataFrame()
-    
-    # Define sites to scrape. We split them to isolate errors (especially LinkedIn).
-    # site_groups = [["indeed", "glassdoor", "naukri"], ["linkedin"]]
-    # Actually, let's just do them in one go but with better logging? 
-    # JobSpy suggests doing them together is faster/better, but for debugging, splitting is useful.
-    # Let's try splitting LinkedIn out.
-    
-    site_configs = [
-        {"sites": ["indeed", "glassdoor", "naukri"], "name": "Standard"},
-        {"sites": ["linkedin"], "name": "LinkedIn"}
-    ]
+def scrape_task(task, cache=None):
+    """
+    Runs a single scrape_jobs call for one grid cell, served from `cache`
+    when a fresh result for the same key is on disk.
+    """
+    hours_old = task.hours_old or HOURS_OLD
+    with METRICS.stage("scrape_jobs", group=task.group, term=task.term, location=task.location,
+                       hours_old=hours_old) as stage:
+        if cache is not None:
+            cached = cache.get(task, hours_old, RESULTS_WANTED)
+            if cached is not None:
+                print(f"   -> Cache hit: {len(cached)} jobs from {task.group} for '{task.term}' in '{task.location}'")
+                stage.update(rows_out=len(cached), cache_hit=True)
+                # Tells stream_scrape the result may predate this run (see ScrapeWindow)
+                cached.attrs["cache_hit"] = True
+                return cached
 
-    for location in LOCATIONS:
-        print(f"Fetching jobs for '{search_term}' in '{location}'...")
-        
-        for config in site_configs:
-            sites = config["sites"]
-            group_name = config["name"]
-            
-            try:
-                print(f"   -> Scraping {group_name} ({', '.join(sites)})...")
-                jobs = scrape_jobs(
-                    site_name=sites,
-                    search_term=search_term,
-                    location=location,
-                    results_wanted=RESULTS_WANTED,
-                    hours_old=HOURS_OLD, 
-                    country_indeed='India', 
-                    country_glassdoor='India',
-                )
-                
-                count = len(jobs)
-                print(f"   -> Found {count} jobs from {group_name}")
-                
-                if not jobs.empty:
-                    jobs['date_posted'] = jobs['date_posted'].astype(str)
-                    all_jobs = pd.concat([all_jobs, jobs], ignore_index=True)
-                    
-            except Exception as e:
-                print(f"   ❌ Error scraping {group_name} for {location}: {e}")
-
-    # 2. Telegram Scraping (Only run if credentials exist)
-    if TELEGRAM_API_ID and TELEGRAM_SESSION_STRING:
-        print(f"Fetching Telegram jobs for '{search_term}'...")
-        try:
+        print(f"   -> Scraping {task.group} ({', '.join(task.sites)}) for '{task.term}' in '{task.location}'...")
+        stage["api_calls"] = 1
+        jobs = site_group_backend(task.group).call(
+            scrape_jobs,
+            site_name=list(task.sites),
+            search_term=task.term,
+            location=task.location,
+            results_wanted=RESULTS_WANTED,
+            hours_old=hours_old,
+            country_indeed='India', 
+            country_glassdoor='India',
+        )
+        print(f"   -> Found {len(jobs)} jobs from {task.group} for '{task.term}' in '{task.location}'")
+        stage["rows_out"] = len(jobs)
+
+    if not jobs.empty:
+        jobs['date_posted'] = jobs['date_posted'].astype(str)
+    if cache is not None:
+        cache.put(task, hours_old, RESULTS_WANTED, jobs)
+    return jobs
+
+def select_shard(tasks, index, count):
+    """
+    Keeps the tasks of shard `index` (1-based) of `count`. (term, location)
+    pairs are dealt round-robin, so each pair's site groups stay together.
+    """
+    pairs = list(dict.fromkeys((task.term, task.location) for task in tasks))
+    mine = set(pairs[index - 1::count])
+    return [task for task in tasks if (task.term, task.location) in mine]
+
+def stream_scrape(search_terms, locations=None, cache=None, window=None, shard=None):
+    """
+    Scrapes every (term, location, site group) combination in parallel and
+    yields each TaskResult as soon as it finishes, so callers can reduce a
+    batch before the next one arrives. Failed tasks are reported here and
+    not yielded. The timing report is printed once the grid is exhausted.
+    Each outcome is marked on `window` (a ScrapeWindow) when given, and
+    `shard` = (index, count) limits the grid to one shard.
+    """
+    tasks = build_scrape_tasks(search_terms, locations, window)
+    if shard is not None:
+        tasks = select_shard(tasks, *shard)
+    caps = {config["name"]: config["max_concurrency"] for config in SITE_GROUPS}
+    print(f"🚀 Scraping {len(tasks)} tasks (caps: {caps})...")
+    if window is not None:
+        hours = window.summary(tasks)
+        print(f"   Scrape window (hours_old: tasks): {hours}")
+        if window.stale:
+            print(f"   ⚠️ {len(window.stale)} term/site group scrapes last succeeded more than {window.max_hours}h ago; "
+                  f"older postings are past the sheets' retention and are not fetched.")
+        METRICS.attach("scrape_window", hours)
+
+    started = time.perf_counter()
+    timings = []
+    with METRICS.stage("scrape_all", rows_in=len(tasks)) as stage:
+        for result in iter_grid(tasks, functools.partial(scrape_task, cache=cache), caps):
+            # Keep only the timings; the frame belongs to the consumer
+            timings.append(dataclasses.replace(result, value=None))
+            if window is not None:
+                window.mark(result.task.term, result.task.group, result.ok,
+                            cached=result.ok and result.value.attrs.get("cache_hit", False))
+            if not result.ok:
+                print(f"   ❌ Error scraping {result.task.group} for {result.task.location}: {result.error}")
+                continue
+            yield result
+        stage["rows_out"] = sum(r.rows for r in timings)
+        stage["errors"] = sum(1 for r in timings if not r.ok)
+
+    timings.sort(key=lambda r: r.index)
+    print_timing_report(timings, wall_time=time.perf_counter() - started)
+    if cache is not None:
+        print(f"   {cache.summary()}")
+        METRICS.count("scrape_cache_hits", cache.hits)
+        METRICS.count("scrape_cache_misses", cache.misses)
+
+def fetch_telegram_jobs(search_configs, high_water_marks=None):
+    """
+    Scans Telegram once for all search configs in a single session.
+    Returns matches tagged with `search_term` and `sheet_name`, or an empty
+    DataFrame when credentials are missing or the scan fails.
+    `high_water_marks` is updated in place with the newest message per channel.
+    """
+    # Only run if credentials exist
+    if not (TELEGRAM_API_ID and TELEGRAM_SESSION_STRING):
+        return pd.DataFrame()
+
+    print(f"Fetching Telegram jobs for {len(search_configs)} terms...")
+    try:
+        with METRICS.stage("scrape_telegram_jobs", rows_in=len(search_configs)) as stage:
             tg_jobs = asyncio.run(scrape_telegram_jobs(
                 TELEGRAM_API_ID, 
                 TELEGRAM_API_HASH, 
                 TELEGRAM_SESSION_STRING, 
                 [], 
-                [search_term]
+                search_configs,
+                high_water_marks=high_water_marks,
+                hours_old=HOURS_OLD,
             ))
-            if not tg_jobs.empty:
-                print(f"   -> Found {len(tg_jobs)} Telegram jobs")
-                all_jobs = pd.concat([all_jobs, tg_jobs], ignore_index=True)
-            else:
-                print("   -> No Telegram jobs found.")
-        except Exception as e:
-            print(f"   ❌ Error scraping Telegram: {e}")
-
-    print(f"Total jobs found for '{search_term}' (before filter): {len(all_jobs)}")
-    
-    # Apply relevance filter to remove engineering/irrelevant jobs
-    all_jobs = filter_relevant_jobs(all_jobs, search_term)
-    
-    print(f"Total relevant jobs for '{search_term}': {len(all_jobs)}")
+            stage["rows_out"] = len(tg_jobs)
+    except Exception as e:
+        print(f"   ❌ Error scraping Telegram: {e}")
+        return pd.DataFrame()
+
+    if tg_jobs.empty:
+        print("   -> No Telegram jobs found.")
+    else:
+        print(f"   -> Found {len(tg_jobs)} Telegram jobs")
+    return tg_jobs
+
+def trim_for_sheet(jobs, extra_columns=()):
+    """
+    Drops the columns the sheets do not need (except `extra_columns`).
+    """
+    return jobs[[column for column in jobs.columns if column in SHEET_COLUMNS or column in extra_columns]]
+
+def filter_batch(jobs, search_terms, label, extra_columns=()):
+    """
+    Relevance-filters one batch for a sheet and trims it to the sheet's columns.
+    """
+    with METRICS.stage("filter_relevant_jobs", rows_in=len(jobs), sheet=label) as stage:
+        jobs = trim_for_sheet(filter_relevant_jobs(jobs, search_terms), extra_columns)
+        stage["rows_out"] = len(jobs)
+    return jobs
+
+def merge_sheet_batches(sheet_name, terms, batches, term_urls, telegram_jobs, dedup_threshold=None):
+    """
+    Concatenates a sheet's filtered batches once, in (term, grid position)
+    order so the result does not depend on which scrape finished first,
+    drops postings already found by an earlier term, collapses the same
+    posting found on several boards and appends the sheet's Telegram
+    matches. `term_urls` holds the raw job_urls scraped per term, used for
+    the term contribution report.
+    """
+    dedup_threshold = NEAR_DUPLICATE_THRESHOLD if dedup_threshold is None else dedup_threshold
+    with METRICS.stage("merge_sheet_jobs", sheet=sheet_name) as stage:
+        _, term_stats = merge_term_results(
+            {term: pd.DataFrame({"job_url": urls}, dtype=object) for term, urls in term_urls.items() if urls},
+            terms,
+        )
+        print_term_report(sheet_name, term_stats)
+        stage["rows_in"] = sum(s["raw"] for s in term_stats)
+
+        frames = [jobs for jobs in batches if not jobs.empty]
+        all_jobs = pd.DataFrame()
+        if frames:
+            all_jobs = pd.concat(frames, ignore_index=True).sort_values(ORDER_COLUMNS, kind="stable")
+            all_jobs = all_jobs[~all_jobs["job_url"].astype(str).duplicated()]
+            all_jobs = all_jobs.drop(columns=ORDER_COLUMNS).reset_index(drop=True)
+
+        if dedup_threshold <= 1 and not all_jobs.empty:
+            with METRICS.stage("near_duplicates", rows_in=len(all_jobs), sheet=sheet_name) as dedup_stage:
+                all_jobs, merges = collapse_near_duplicates(all_jobs, dedup_threshold)
+                dedup_stage.update(rows_out=len(all_jobs), merged=merges)
+            print_dedup_report(sheet_name, merges)
+            METRICS.count("near_duplicates_merged", dedup_stage["rows_in"] - len(all_jobs))
+
+        # Telegram results (scanned once per run, routed here by sheet)
+        if not telegram_jobs.empty:
+            telegram_jobs = telegram_jobs.drop(columns=TELEGRAM_ROUTING_COLUMNS, errors="ignore")
+            telegram_jobs = filter_batch(telegram_jobs, terms, sheet_name)
+            all_jobs = pd.concat([all_jobs, telegram_jobs], ignore_index=True)
+
+        print(f"Total relevant jobs for '{sheet_name}': {len(all_jobs)}")
+        stage["rows_out"] = len(all_jobs)
     return all_jobs
 
-def update_sheet(jobs_df, sheet_name):
-    # 1. Cleanup old jobs first
-    remove_expired_jobs(sheet_name)
+def collect_sheet_batches(plan, results, seen=None, shard_order=0):
+    """
+    Filters scrape results for a query plan as they arrive. `results` is an
+    iterable of scrape TaskResults (usually stream_scrape()). Raw batches
+    are filtered and trimmed for every sheet that queried their term every
+    FILTER_BATCH_ROWS rows, so only the reduced rows are held until the
+    scrape ends. With `seen` (a SeenUrls), jobs an earlier run ingested
+    into a sheet are dropped from that sheet's batches before filtering.
+    Returns ({sheet_name: [filtered frames]}, {term: [raw job_urls]}); the
+    frames carry ORDER_COLUMNS for merge_sheet_batches.
+    """
+    term_sheets = {}
+    for sheet_name, terms in plan.items():
+        for term in terms:
+            term_sheets.setdefault(term, []).append(sheet_name)
+
+    waiting = {sheet_name: [] for sheet_name in plan}
+    filtered = {sheet_name: [] for sheet_name in plan}
+    term_urls = {term: [] for term in term_sheets}
+
+    def flush(sheet_name):
+        if waiting[sheet_name]:
+            batch = pd.concat(waiting[sheet_name], ignore_index=True)
+            waiting[sheet_name] = []
+            filtered[sheet_name].append(filter_batch(batch, plan[sheet_name], sheet_name, ORDER_COLUMNS))
+
+    for result in results:
+        jobs, term = result.value, result.task.term
+        if jobs.empty:
+            continue
+        urls = jobs["job_url"].astype(str).tolist()
+        term_urls[term].extend(urls)
+        for sheet_name in term_sheets.get(term, []):
+            sheet_batch = jobs[seen.unseen(urls, sheet_name)] if seen is not None else jobs
+            if sheet_batch.empty:
+                continue
+            order = {"_term_order": plan[sheet_name].index(term), "_shard_order": shard_order, "_task_order": result.index}
+            waiting[sheet_name].append(sheet_batch.assign(**order))
+            if sum(len(batch) for batch in waiting[sheet_name]) >= FILTER_BATCH_ROWS:
+                flush(sheet_name)
+
+    for sheet_name in plan:
+        flush(sheet_name)
+    return filtered, term_urls
+
+def collect_sheet_jobs(plan, results, telegram_jobs, dedup_threshold=None, seen=None):
+    """
+    Builds {sheet_name: filtered jobs} for a query plan from streamed scrape
+    results (see collect_sheet_batches) and the run's Telegram matches.
+    """
+    batches, term_urls = collect_sheet_batches(plan, results, seen)
+    return merge_sheets(plan, batches, term_urls, telegram_jobs, dedup_threshold)
+
+def merge_sheets(plan, batches, term_urls, telegram_jobs, dedup_threshold=None):
+    """
+    Runs merge_sheet_batches for every sheet of the plan.
+    """
+    sheet_jobs = {}
+    for sheet_name, terms in plan.items():
+        print(f"\nProcessing: {len(terms)} terms -> {sheet_name}")
+        sheet_telegram_jobs = telegram_jobs[telegram_jobs["sheet_name"] == sheet_name] if not telegram_jobs.empty else telegram_jobs
+        sheet_jobs[sheet_name] = merge_sheet_batches(
+            sheet_name, terms, batches.pop(sheet_name, []),
+            {term: term_urls.get(term, []) for term in terms}, sheet_telegram_jobs, dedup_threshold,
+        )
+    return sheet_jobs
+
+def mark_ingested(seen, sheet_jobs):
+    """
+    Stages the URLs each sheet is about to receive, including the
+    alternate URLs of collapsed near-duplicates, as seen for that sheet.
+    """
+    for sheet_name, jobs in sheet_jobs.items():
+        if jobs.empty:
+            continue
+        seen.add(jobs["job_url"].astype(str).tolist(), sheet_name)
+        if "alternate_urls" in jobs.columns:
+            alternates = [url.strip() for value in jobs["alternate_urls"].dropna().astype(str)
+                          for url in value.split(",") if url.strip()]
+            seen.add(alternates, sheet_name)
+
+def write_sheets(sheet_jobs, dedup_threshold=None):
+    """
+    Writes each sheet's collected jobs with a single update_sheet call.
+    """
+    for sheet_name, jobs in sheet_jobs.items():
+        print(f"\n📝 Updating sheet '{sheet_name}'...")
+        update_sheet(jobs, sheet_name, dedup_threshold)
+
+def drop_known_duplicates(sheet_name, jobs_df, entries, threshold):
+    """
+    Drops jobs that are new to the sheet by URL but copies of a job an
+    earlier run already added to it: an alternate URL recorded for that
+    job, or the same company, city and title with near-identical text. Then
+    stores the fingerprints of the remaining new jobs and their alternate
+    URLs for the next runs. `entries` are the rows' fingerprints from
+    collapse_near_duplicates; rows without one (Telegram posts, which all
+    share one company and location) are never matched or stored.
+    """
+    store = get_job_store()
+    known = store.known_urls(sheet_name, jobs_df["job_url"])
+    aliases = store.alternate_urls(sheet_name, jobs_df["job_url"])
+    is_new = ~jobs_df["job_url"].isin(known | set(aliases)).to_numpy()
+    new_jobs = jobs_df[is_new].reset_index(drop=True)
+    entries = [entry for entry, new in zip(entries, is_new) if new]
+
+    stored = store.fingerprints(sheet_name, [entry[0] for entry in entries if entry is not None])
+    matches = match_fingerprints(entries, stored, threshold)
+    duplicates = {url: (canonical, 1.0) for url, canonical in aliases.items()}
+    duplicates.update((new_jobs["job_url"].iloc[position], match) for position, match in matches.items())
+    if duplicates:
+        print(f"🧬 Skipped {len(duplicates)} postings already in '{sheet_name}' under another URL:")
+    for url, (canonical, score) in list(duplicates.items())[:10]:
+        print(f"   {url} ~ {canonical} (similarity={score:.2f})")
+    METRICS.count("near_duplicates_known", len(duplicates))
+
+    records = []
+    alternates = new_jobs["alternate_urls"] if "alternate_urls" in new_jobs.columns else [""] * len(new_jobs)
+    for position, (url, entry, others) in enumerate(zip(new_jobs["job_url"], entries, alternates)):
+        if position in matches or entry is None:
+            continue
+        block, signature = entry
+        signature = signature.tobytes()
+        records.append((url, url, block, signature))
+        records.extend((other.strip(), url, block, signature) for other in others.split(",") if other.strip())
+    store.add_fingerprints(sheet_name, records)
+    return jobs_df[~jobs_df["job_url"].isin(set(duplicates))]
+
+def update_sheet(jobs_df, sheet_name, dedup_threshold=None):
+    """
+    Records the sheet's new jobs in the job store, where duplicates and
+    expiry are resolved locally, then syncs the resulting diff to the sheet.
+    Jobs that near-duplicate one added by an earlier run are left out unless
+    `dedup_threshold` is above 1.
+    """
+    dedup_threshold = NEAR_DUPLICATE_THRESHOLD if dedup_threshold is None else dedup_threshold
+    calls_before = SHEETS.api_calls()
+    with METRICS.stage("update_sheet", rows_in=len(jobs_df), sheet=sheet_name) as stage:
+        store = get_job_store()
+        if not store.has_sheet(sheet_name):
+            import_sheet(sheet_name)
+
+        # 1. Cleanup old jobs first
+        remove_expired_jobs(sheet_name)
 
-    if jobs_df.empty:
-        print(f"No NEW jobs found for '{sheet_name}'.")
+        added = 0
+        if jobs_df.empty:
+            print(f"No NEW jobs found for '{sheet_name}'.")
+        else:
+            # Clean up dataframe
+            entries = [entry if isinstance(entry, tuple) else None
+                       for entry in jobs_df.get(FINGERPRINT_COLUMN, [None] * len(jobs_df))]
+            jobs_df = jobs_df.drop(columns=[FINGERPRINT_COLUMN], errors="ignore")
+            jobs_df = jobs_df.fillna('')
+            jobs_df = jobs_df.astype(str)
+            if dedup_threshold <= 1:
+                jobs_df = drop_known_duplicates(sheet_name, jobs_df, entries, dedup_threshold)
+            added = store.add_jobs(sheet_name, jobs_df.to_dict('records'))
+            print(f"Checked {len(jobs_df)} jobs for duplicates: {added} new for '{sheet_name}'.")
+
+        sync_sheet(sheet_name)
+        stage.update(rows_out=added, api_calls=SHEETS.api_calls() - calls_before)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the local scrape cache")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached scrape results but store fresh ones")
+    parser.add_argument("--full-window", action="store_true",
+                        help=f"Scrape the full {HOURS_OLD}h window and keep jobs seen by earlier runs")
+    parser.add_argument("--rebuild-sheets", action="store_true", help="Rewrite every sheet from the local job store and exit")
+    parser.add_argument("--dedup-threshold", type=float, default=NEAR_DUPLICATE_THRESHOLD,
+                        help="Similarity above which postings on different boards are merged (above 1 disables)")
+    parser.add_argument("--report", default=RUN_REPORT_PATH, help="Where to write the JSON run report")
+    parser.add_argument("--prometheus-textfile", help="Also export run metrics in Prometheus textfile format")
+    sharding = parser.add_argument_group("sharding", "Scrape part of the grid without touching Google Sheets, then merge")
+    sharding.add_argument("--shard", help="Scrape shard i of N, e.g. 2/3 (Telegram is scanned by shard 1)")
+    sharding.add_argument("--terms", help="Comma-separated search terms to scrape (default: all)")
+    sharding.add_argument("--locations", help="Comma-separated locations to scrape (default: all)")
+    sharding.add_argument("--skip-telegram", action="store_true", help="Do not scan Telegram in this shard")
+    sharding.add_argument("--shard-output", default=SHARD_OUTPUT_DIR, help="Where shards write their results")
+    sharding.add_argument("--merge", metavar="DIR", help="Merge the shards found in DIR and write the sheets once")
+    args = parser.parse_args(argv)
+    if args.shard:
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    print("--- Starting Job Bot ---")
+    try:
+        run(args)
+        METRICS.status = "success"
+    except BaseException as e:
+        METRICS.status = "failed"
+        METRICS.error = repr(e)
+        raise
+    finally:
+        METRICS.attach("sheets", SHEETS.stats)
+        METRICS.attach("backends", backend_stats())
+        METRICS.write_json(args.report)
+        if args.prometheus_textfile:
+            METRICS.write_prometheus(args.prometheus_textfile)
+
+def open_scrape_cache(args):
+    return ScrapeCache(
+        os.path.join(CACHE_DIR, "scrapes"),
+        ttl_hours=SCRAPE_CACHE_TTL_HOURS,
+        max_bytes=SCRAPE_CACHE_MAX_MB * 1024 * 1024,
+        enabled=not args.no_cache,
+        refresh=args.refresh,
+    )
+
+def open_run_state(args, started_at=None):
+    """
+    Loads the scrape window and the seen URLs of earlier runs.
+    """
+    window = ScrapeWindow(SCRAPE_WINDOW_PATH, max_hours=HOURS_OLD, overlap_hours=SCRAPE_WINDOW_OVERLAP_HOURS,
+                          enabled=not args.full_window, now=started_at)
+    seen = SeenUrls(SEEN_URLS_PATH, rotate_hours=HOURS_OLD, enabled=not args.full_window)
+    return window, seen
+
+def telegram_configs(plan):
+    return [{"term": term, "sheet_name": sheet_name} for sheet_name, terms in plan.items() for term in terms]
+
+def finish_run(telegram_marks, window, seen):
+    """
+    Commits the run's state once every sheet has been written: only then
+    do the Telegram marks, the scrape window and the seen URLs advance.
+    """
+    save_high_water_marks(TELEGRAM_STATE_PATH, telegram_marks)
+    window.save()
+    seen.save()
+    get_job_store().prune()
+    SHEETS.print_stats()
+    print_resilience_report()
+    print("\n--- Bot Finished ---")
+
+def run(args):
+    plan = plan_queries(SEARCH_CONFIGS)
+    if args.rebuild_sheets:
+        for sheet_name in plan:
+            rebuild_sheet(sheet_name)
+        SHEETS.print_stats()
         return
+    if args.merge:
+        return run_merge(args, plan)
+    if args.shard or args.terms or args.locations:
+        return run_shard(args, plan)
 
-    sheet = connect_to_sheet(sheet_name)
-    
-    # Get existing data to prevent duplicates
-    existing_data = sheet.get_all_records()
-    existing_links = set(str(row['job_url']) for row in existing_data if 'job_url' in row)
-    
-    print(f"Checking for duplicates against {len(existing_links)} existing links...")
+    cache = open_scrape_cache(args)
+    window, seen = open_run_state(args)
+    telegram_marks = load_high_water_marks(TELEGRAM_STATE_PATH)
+    telegram_jobs = fetch_telegram_jobs(telegram_configs(plan), high_water_marks=telegram_marks)
 
-    # Clean up dataframe
-    jobs_df = jobs_df.fillna('')
-    jobs_df = jobs_df.astype(str)
-    
-    new_jobs = []
-    for _, row in jobs_df.iterrows():
-        # Ensure we have a URL to check against
-        url = str(row.get('job_url', ''))
-        if url and url not in existing_links:
-            job_data = row.tolist()
-            new_jobs.append(job_data)
-            existing_links.add(url)
-    
-    if new_jobs:
-        # If sheet is empty/new, add headers
-        if not existing_data and sheet.row_count > 0:
-             # Check if header row exists, if not add it
-             current_headers = sheet.row_values(1)
-             if not current_headers:
-                 headers = jobs_df.columns.tolist()
-                 sheet.insert_row(headers, 1)
-        
-        sheet.append_rows(new_jobs)
-        print(f"✅ Added {len(new_jobs)} new jobs to sheet '{sheet_name}'.")
+    # Filter each scrape batch as it arrives and collect every sheet's jobs
+    # across all of its terms, then write each sheet once: one expiry pass,
+    # one dedup and one batched append.
+    sheet_jobs = collect_sheet_jobs(
+        plan, stream_scrape(distinct_queries(plan), cache=cache, window=window), telegram_jobs,
+        args.dedup_threshold, seen,
+    )
+    if seen.dropped:
+        print(f"👀 Dropped {seen.dropped} jobs already ingested by earlier runs.")
+    METRICS.count("seen_urls_dropped", seen.dropped)
+    mark_ingested(seen, sheet_jobs)
+    write_sheets(sheet_jobs, args.dedup_threshold)
+    finish_run(telegram_marks, window, seen)
+
+def select_terms(plan, terms_arg):
+    """
+    Resolves --terms against the plan's distinct queries.
+    """
+    queries = distinct_queries(plan)
+    if not terms_arg:
+        return queries
+    by_key = {normalize_term(term): term for term in queries}
+    selected = []
+    for term in terms_arg.split(","):
+        if normalize_term(term) not in by_key:
+            raise SystemExit(f"Unknown search term {term.strip()!r}; expected one of: {', '.join(queries)}")
+        selected.append(by_key[normalize_term(term)])
+    return [term for term in queries if term in selected]
+
+def run_shard(args, plan):
+    """
+    Scrapes one shard of the grid and writes its filtered results, Telegram
+    matches and pending state to args.shard_output. Google Sheets and the
+    local state files are left alone; run_merge commits them.
+    """
+    terms = select_terms(plan, args.terms)
+    locations = [location.strip() for location in args.locations.split(",")] if args.locations else LOCATIONS
+    index, count = args.shard or (None, None)
+    if args.shard:
+        label = f"shard-{index}-of-{count}"
     else:
-        print(f"No NEW jobs found for '{sheet_name}' (all duplicates).")
+        label = "shard-" + hashlib.sha1(json.dumps([terms, locations]).encode()).hexdigest()[:8]
+    shard_plan = {sheet_name: [term for term in sheet_terms if term in terms] for sheet_name, sheet_terms in plan.items()}
+    shard_plan = {sheet_name: sheet_terms for sheet_name, sheet_terms in shard_plan.items() if sheet_terms}
+    print(f"🧩 Running {label}: {len(terms)} terms x {len(locations)} locations")
+
+    cache = open_scrape_cache(args)
+    window, seen = open_run_state(args)
+    telegram_marks = telegram_jobs = None
+    if index in (None, 1) and not args.skip_telegram:
+        telegram_marks = load_high_water_marks(TELEGRAM_STATE_PATH)
+        telegram_jobs = fetch_telegram_jobs(telegram_configs(plan), high_water_marks=telegram_marks)
+
+    batches, term_urls = collect_sheet_batches(
+        shard_plan,
+        stream_scrape(terms, locations, cache=cache, window=window, shard=args.shard),
+        seen,
+        shard_order=index or 0,
+    )
+    METRICS.count("seen_urls_dropped", seen.dropped)
+    sheet_jobs = {
+        sheet_name: pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ORDER_COLUMNS)
+        for sheet_name, frames in batches.items()
+    }
+    manifest = {
+        "index": index,
+        "count": count,
+        "terms": terms,
+        "locations": locations,
+        "started_at": window.started_at.isoformat(),
+        "window": {"succeeded": sorted(window.succeeded), "failed": sorted(window.failed),
+                   "cached": sorted(window.cached)},
+        "telegram_marks": telegram_marks,
+        "seen_dropped": seen.dropped,
+    }
+    write_shard(args.shard_output, label, manifest, sheet_jobs, term_urls, telegram_jobs)
+
+def run_merge(args, plan):
+    """
+    Combines the shards in args.merge: dedups across them, writes every
+    sheet once and commits the shards' Telegram marks, scrape window and
+    seen URLs.
+    """
+    shards = read_shards(args.merge)
+    if not shards:
+        raise SystemExit(f"No complete shards found in {args.merge}")
+    print(f"🧩 Merging {len(shards)} shards: {', '.join(shard['label'] for shard in shards)}")
+
+    started_at = min(datetime.fromisoformat(shard["started_at"]) for shard in shards)
+    window, seen = open_run_state(args, started_at=started_at)
+    telegram_marks = load_high_water_marks(TELEGRAM_STATE_PATH)
+    telegram_frames = []
+    batches = {sheet_name: [] for sheet_name in plan}
+    term_urls = {}
+    for shard in shards:
+        window.succeeded.update(shard["window"]["succeeded"])
+        window.failed.update(shard["window"]["failed"])
+        window.cached.update(shard["window"].get("cached", []))
+        for channel, message_id in (shard.get("telegram_marks") or {}).items():
+            telegram_marks[channel] = max(telegram_marks.get(channel, 0), int(message_id))
+        if shard["telegram_jobs"] is not None and not shard["telegram_jobs"].empty:
+            telegram_frames.append(shard["telegram_jobs"])
+        for sheet_name, jobs in shard["sheet_jobs"].items():
+            if sheet_name in batches:
+                batches[sheet_name].append(jobs)
+        for term, urls in shard["term_urls"].items():
+            term_urls.setdefault(term, []).extend(urls)
+        METRICS.count("seen_urls_dropped", shard.get("seen_dropped", 0))
+
+    telegram_jobs = pd.DataFrame()
+    if telegram_frames:
+        telegram_jobs = pd.concat(telegram_frames, ignore_index=True).drop_duplicates(["job_url", "sheet_name"])
+    sheet_jobs = merge_sheets(plan, batches, term_urls, telegram_jobs, args.dedup_threshold)
+    mark_ingested(seen, sheet_jobs)
+    write_sheets(sheet_jobs, args.dedup_threshold)
+    finish_run(telegram_marks, window, seen)
 
 if __name__ == "__main__":
-    print("--- Starting Job Bot ---")
-    for config in SEARCH_CONFIGS:
-        term = config["term"]
-        sheet_name = config["sheet_name"]
-        
-        print(f"\nProcessing: {term} -> {sheet_name}")
-        jobs = fetch_jobs(term)
-        update_sheet(jobs, sheet_name)
-    print("\n--- Bot Finished ---")
+    main()
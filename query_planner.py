@@ -0,0 +1,95 @@
+import re
+import pandas as pd
+
+
+def normalize_term(term):
+    """
+    Canonical form used to spot search terms that are the same query.
+    """
+    return re.sub(r"\s+", " ", str(term)).strip().lower()
+
+
+def plan_queries(search_configs):
+    """
+    Groups SEARCH_CONFIGS by sheet_name and drops terms that normalize to a
+    query already planned. Returns {sheet_name: [term, ...]} in config order;
+    a term shared by several sheets keeps the spelling it was first seen with
+    so it is scraped only once.
+    """
+    canonical = {}
+    plan = {}
+    for config in search_configs:
+        key = normalize_term(config["term"])
+        term = canonical.setdefault(key, config["term"])
+        sheet_terms = plan.setdefault(config["sheet_name"], [])
+        if term in sheet_terms:
+            print(f"   -> Skipping duplicate query '{config['term']}' for '{config['sheet_name']}'")
+            continue
+        sheet_terms.append(term)
+    return plan
+
+
+def distinct_queries(plan):
+    """
+    Flattens a plan into the list of distinct terms to scrape.
+    """
+    terms = []
+    for sheet_terms in plan.values():
+        for term in sheet_terms:
+            if term not in terms:
+                terms.append(term)
+    return terms
+
+
+def merge_term_results(scraped, terms):
+    """
+    Concatenates the scrape results of a sheet's terms and drops postings
+    already found by an earlier term (by job_url).
+    Returns (merged DataFrame, per-term stats):
+      raw    - rows the term's scrape returned
+      new    - rows it added on top of the terms before it
+      unique - postings no other term in the group found
+    """
+    url_sets = {}
+    for term in terms:
+        jobs = scraped.get(term)
+        url_sets[term] = set() if jobs is None or jobs.empty else set(jobs["job_url"].astype(str))
+
+    frames = []
+    seen = set()
+    stats = []
+    for term in terms:
+        jobs = scraped.get(term)
+        if jobs is None or jobs.empty:
+            stats.append({"term": term, "raw": 0, "new": 0, "unique": 0})
+            continue
+
+        # Object dtype: isin() against a large Python set is slow on Arrow strings
+        urls = jobs["job_url"].astype(str).astype(object)
+        new_mask = ~urls.duplicated() & ~urls.isin(seen)
+        frames.append(jobs[new_mask.values])
+        seen.update(urls[new_mask])
+
+        others = set().union(*(url_sets[other] for other in terms if other != term))
+        stats.append({
+            "term": term,
+            "raw": len(jobs),
+            "new": int(new_mask.sum()),
+            "unique": len(url_sets[term] - others),
+        })
+
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return merged, stats
+
+
+def print_term_report(sheet_name, stats):
+    """
+    Prints how much each term contributes to its sheet, flagging terms whose
+    postings were all found by other terms as candidates for pruning.
+    """
+    total_raw = sum(s["raw"] for s in stats)
+    total_new = sum(s["new"] for s in stats)
+    print(f"📊 Term contribution for '{sheet_name}' ({total_new} unique of {total_raw} scraped):")
+    for s in stats:
+        note = "  <- redundant" if s["raw"] and not s["unique"] else ""
+        print(f"   {s['term'][:40]:<40} raw={s['raw']:<4} new={s['new']:<4} unique={s['unique']:<4}{note}")
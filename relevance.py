@@ -0,0 +1,188 @@
+import re
+from functools import lru_cache
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    # Arrow-backed strings run str.contains in C (RE2) over the whole column
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    TEXT_DTYPE = object
+
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+# --- Relevance Filter ---
+# Positive keywords: at least ONE must appear in the job title or description
+POSITIVE_KEYWORDS = [
+    "medical coding", "medical coder",
+    "inpatient coding", "inpatient coder",
+    "ip-drg", "ip drg", "drg coding", "drg coder",
+    "clinical coding", "clinical coder",
+    "clinical documentation", "cdi", "cdip",
+    "hcc", "risk adjustment",
+    "icd-10", "icd 10", "icd10",
+    "cpc", "ccs",
+    "ahima", "aapc",
+    "health information management", "him ",
+    "revenue cycle",
+    "outpatient coding", "outpatient coder",
+    "diagnosis coding", "procedure coding",
+    "coding specialist", "coding analyst",
+    "coding auditor", "coding educator",
+    "chart review", "medical record",
+]
+
+# Negative keywords: if ANY appears in the job TITLE, the job is excluded
+NEGATIVE_TITLE_KEYWORDS = [
+    "software engineer", "software developer", "software development",
+    "web developer", "frontend", "front-end", "backend", "back-end",
+    "full stack", "fullstack", "full-stack",
+    "devops", "data engineer", "data scientist",
+    "machine learning", "ml engineer", "ai engineer",
+    "python developer", "java developer", "javascript",
+    "react", "angular", "node.js", "vue.js",
+    "cloud engineer", "sre", "site reliability",
+    "qa engineer", "test engineer", "automation engineer",
+    "embedded", "firmware", "hardware engineer",
+    "mechanical engineer", "civil engineer", "electrical engineer",
+    "network engineer", "system administrator", "sysadmin",
+    "cybersecurity", "information security",
+    "database administrator", "dba",
+    "ui/ux", "ux designer", "ui designer",
+    "product manager", "scrum master",
+    "blockchain", "crypto",
+]
+
+
+def _escape(char):
+    # Only escape regex metacharacters so the pattern is valid for both re and RE2
+    return "\\" + char if char in _REGEX_SPECIAL else char
+
+
+def _trie_regex(keywords):
+    """
+    Builds one regex matching any of `keywords` as a plain substring (like
+    `kw in text`). The alternation is factored into a prefix trie, so at each
+    text position the engine checks one character class instead of trying
+    every keyword in turn.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def to_regex(node):
+        if "" in node and len(node) == 1:
+            return ""
+        branches = [_escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ends here: whatever follows is optional
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return to_regex(trie)
+
+
+# Both lists compiled once into a single trie-shaped pattern each.
+NEGATIVE_TITLE_PATTERN = re.compile(_trie_regex(NEGATIVE_TITLE_KEYWORDS))
+POSITIVE_PATTERN = re.compile(_trie_regex(POSITIVE_KEYWORDS))
+
+
+@lru_cache(maxsize=64)
+def _search_term_pattern(search_terms):
+    terms = [term.lower() for term in search_terms if term]
+    if not terms:
+        return None
+    return re.compile(_trie_regex(terms))
+
+
+def _as_terms(search_terms):
+    if isinstance(search_terms, str):
+        return (search_terms,)
+    return tuple(search_terms)
+
+
+def _lower_text(jobs_df, column):
+    # Missing values become "" (row by row they were 'nan'/'none', which no keyword matches)
+    if column not in jobs_df.columns:
+        return pd.Series("", index=jobs_df.index, dtype=TEXT_DTYPE)
+    return jobs_df[column].fillna("").astype(str).astype(TEXT_DTYPE).str.lower()
+
+
+def _relevance_masks(jobs_df, search_terms):
+    titles = _lower_text(jobs_df, 'title')
+    combined_text = titles + " " + _lower_text(jobs_df, 'description')
+
+    term_pattern = _search_term_pattern(_as_terms(search_terms))
+    if term_pattern is None:
+        term_hit = pd.Series(False, index=jobs_df.index)
+    else:
+        term_hit = titles.str.contains(term_pattern.pattern)
+
+    return (
+        titles,
+        combined_text,
+        titles.str.contains(NEGATIVE_TITLE_PATTERN.pattern),
+        combined_text.str.contains(POSITIVE_PATTERN.pattern),
+        term_hit,
+    )
+
+
+def explain_relevance(jobs_df, search_terms):
+    """
+    Returns a Series (aligned with jobs_df) describing why each row is kept
+    or dropped, e.g. "negative: react", "positive: icd-10",
+    "search term: cdi coder" or "no keyword". The keyword named is the
+    leftmost match in the text.
+    """
+    if jobs_df.empty:
+        return pd.Series(dtype=object, index=jobs_df.index)
+
+    titles, combined_text, is_engineering, has_positive, term_hit = _relevance_masks(jobs_df, search_terms)
+
+    reasons = pd.Series("no keyword", index=jobs_df.index, dtype=object)
+    term_pattern = _search_term_pattern(_as_terms(search_terms))
+    if term_pattern is not None and term_hit.any():
+        reasons[term_hit] = "search term: " + titles[term_hit].str.extract(f"({term_pattern.pattern})", expand=False)
+    if has_positive.any():
+        reasons[has_positive] = "positive: " + combined_text[has_positive].str.extract(f"({POSITIVE_PATTERN.pattern})", expand=False)
+    if is_engineering.any():
+        reasons[is_engineering] = "negative: " + titles[is_engineering].str.extract(f"({NEGATIVE_TITLE_PATTERN.pattern})", expand=False)
+    return reasons
+
+
+def filter_relevant_jobs(jobs_df, search_terms, explain=False):
+    """
+    Filters a DataFrame of jobs to keep only healthcare coding/CDI relevant results.
+    Uses positive keyword matching + negative keyword exclusion on title.
+    `search_terms` is a term or a list of terms; a job whose title contains
+    any of them is kept even without a positive keyword.
+    With `explain=True` the kept rows get a `relevance_reason` column
+    (see explain_relevance).
+    """
+    if jobs_df.empty:
+        return jobs_df
+
+    original_count = len(jobs_df)
+
+    # Step 1: drop titles with a negative (engineering) keyword.
+    # Step 2: keep rows with a positive keyword in title + description, or
+    # one of the original search terms in the title.
+    _, _, is_engineering, has_positive, term_hit = _relevance_masks(jobs_df, search_terms)
+    keep = ~is_engineering & (has_positive | term_hit)
+
+    filtered_df = jobs_df[keep.values]
+    if explain:
+        filtered_df = filtered_df.assign(relevance_reason=explain_relevance(filtered_df, search_terms))
+    filtered_df = filtered_df.reset_index(drop=True)
+    removed_count = original_count - len(filtered_df)
+    
+    if removed_count > 0:
+        print(f"   🔍 Relevance filter: Kept {len(filtered_df)}/{original_count} jobs ({removed_count} irrelevant removed)")
+    else:
+        print(f"   🔍 Relevance filter: All {original_count} jobs are relevant")
+    
+    return filtered_df
@@ -0,0 +1,317 @@
+import time
+import random
+import asyncio
+import threading
+
+# Status codes and message fragments treated as transient
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_MESSAGES = ("429", "quota", "rate limit", "resource exhausted", "timed out", "timeout",
+                      "temporarily unavailable", "connection reset", "connection aborted")
+# The subset that means the server refused the request without applying it
+REJECTED_MESSAGES = ("429", "quota", "rate limit", "resource exhausted")
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a backend whose circuit breaker has tripped.
+    """
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second on average with
+    bursts of up to `capacity`. acquire() blocks until a token is available
+    and returns how long it waited.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Takes a token now (possibly going negative) and returns the wait owed
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        """
+        acquire() for coroutines: waits without blocking the event loop.
+        Tokens are handed out in call order, so waiters form a FIFO queue.
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and stays open
+    for the rest of the run, so a backend that keeps failing is skipped
+    instead of burning retries. Long-running processes (the Telegram bot)
+    can pass `reset_after` seconds to let one trial call through again.
+    """
+
+    def __init__(self, failure_threshold=3, reset_after=None):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            if self.consecutive_failures < self.failure_threshold:
+                return False
+            if self.reset_after is not None and time.monotonic() - self._opened_at >= self.reset_after:
+                # Half-open: the next failure opens it again
+                self.consecutive_failures = self.failure_threshold - 1
+                return False
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures == self.failure_threshold:
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+def status_code(exc):
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None) or getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_seconds(exc):
+    """
+    Server-requested delay carried by an error, if any: Telegram FloodWait
+    (`seconds`), an HTTP `Retry-After` header, or a `retry_after` attribute.
+    """
+    seconds = getattr(exc, "seconds", None) if type(exc).__name__.startswith("FloodWait") else None
+    if seconds is None:
+        seconds = getattr(exc, "retry_after", None)
+    if seconds is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        seconds = headers.get("Retry-After") if hasattr(headers, "get") else None
+    try:
+        return max(0.0, float(seconds)) if seconds is not None else None
+    except (TypeError, ValueError):
+        # Retry-After may also be an HTTP date; fall back to our own backoff
+        return None
+
+
+def is_retryable(exc):
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (TimeoutError, ConnectionError)) or retry_after_seconds(exc) is not None:
+        return True
+    if status_code(exc) in RETRYABLE_STATUS:
+        return True
+    message = str(exc).lower()
+    return any(fragment in message for fragment in RETRYABLE_MESSAGES)
+
+
+def is_rejected(exc):
+    """
+    True for errors meaning the request was refused before being applied
+    (429 / quota / Retry-After), so even a non-idempotent write can be
+    sent again. Timeouts and 5xx may come after the server applied it.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if status_code(exc) == 429 or retry_after_seconds(exc) is not None:
+        return True
+    message = str(exc).lower()
+    return any(fragment in message for fragment in REJECTED_MESSAGES)
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=60.0, retry_after=None):
+    """
+    Jittered exponential backoff for retry number `attempt` (0-based),
+    never shorter than a server-requested `retry_after`.
+    """
+    delay = random.uniform(base_delay, max(base_delay, min(max_delay, base_delay * 2 ** (attempt + 1))))
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, base_delay)
+    return delay
+
+
+class Backend:
+    """
+    Rate limiter, retry policy and circuit breaker for one external service
+    (a jobspy site group, Google Sheets, Gemini), with counters for the run
+    report.
+    """
+
+    def __init__(self, name, rate=None, burst=1, max_attempts=3, base_delay=2.0, max_delay=60.0,
+                 max_retry_after=300.0, failure_threshold=3, reset_after=None, passthrough=()):
+        self.name = name
+        # Expected errors (e.g. WorksheetNotFound) re-raised without retrying
+        # or counting against the circuit breaker
+        self.passthrough = tuple(passthrough)
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_after)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "skipped": 0,
+                      "rate_wait": 0.0, "backoff_wait": 0.0}
+        self._lock = threading.Lock()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _next_delay(self, exc, attempt, retryable=is_retryable):
+        """
+        Seconds to wait before retrying after `exc`, or None to give up.
+        """
+        if attempt + 1 >= self.max_attempts or not retryable(exc):
+            return None
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        return backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+
+    def _before_call(self):
+        if self.breaker.is_open:
+            self._count("skipped")
+            raise CircuitOpenError(f"{self.name} skipped: circuit open after repeated failures")
+        self._count("calls")
+
+    def _after_failure(self, exc):
+        self._count("failures")
+        if self.breaker.record_failure():
+            until = f"for {self.breaker.reset_after:.0f}s" if self.breaker.reset_after else "for the rest of the run"
+            print(f"   🔌 {self.name}: {self.breaker.failure_threshold} consecutive failures, "
+                  f"skipping it {until} ({exc})")
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Calls fn(*args, **kwargs) under the rate limit, retrying transient
+        errors. The last error is re-raised once retries are exhausted.
+        """
+        return self._call(fn, args, kwargs, is_retryable)
+
+    def call_write(self, fn, *args, **kwargs):
+        """
+        call() for writes that are not safe to repeat (appends, row
+        deletes): only retried when the server refused the request (see
+        is_rejected), never after a timeout or 5xx that may have been applied.
+        """
+        return self._call(fn, args, kwargs, is_rejected)
+
+    def _call(self, fn, args, kwargs, retryable):
+        self._before_call()
+        for attempt in range(self.max_attempts):
+            if self.limiter is not None:
+                self._count("rate_wait", self.limiter.acquire())
+            try:
+                result = fn(*args, **kwargs)
+            except self.passthrough:
+                raise
+            except Exception as e:
+                delay = self._next_delay(e, attempt, retryable)
+                if delay is None:
+                    self._after_failure(e)
+                    raise
+                print(f"   ⏳ {self.name}: {e.__class__.__name__} - retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 2}/{self.max_attempts})")
+                self._count("retries")
+                self._count("backoff_wait", delay)
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, fn, *args, **kwargs):
+        """
+        call() for coroutines: the blocking fn runs in a worker thread and
+        rate-limit and backoff waits are asyncio sleeps, so the event loop
+        keeps serving other work meanwhile.
+        """
+        self._before_call()
+        for attempt in range(self.max_attempts):
+            if self.limiter is not None:
+                self._count("rate_wait", await self.limiter.acquire_async())
+            try:
+                result = await asyncio.to_thread(fn, *args, **kwargs)
+            except self.passthrough:
+                raise
+            except Exception as e:
+                delay = self._next_delay(e, attempt)
+                if delay is None:
+                    self._after_failure(e)
+                    raise
+                print(f"   ⏳ {self.name}: {e.__class__.__name__} - retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 2}/{self.max_attempts})")
+                self._count("retries")
+                self._count("backoff_wait", delay)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+
+_BACKENDS = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_backend(name, **settings):
+    """
+    Returns the process-wide Backend called `name`, creating it with
+    `settings` (see Backend) on first use.
+    """
+    with _BACKENDS_LOCK:
+        if name not in _BACKENDS:
+            _BACKENDS[name] = Backend(name, **settings)
+        return _BACKENDS[name]
+
+
+def backend_stats():
+    """
+    {backend name: counters} for the run report.
+    """
+    return {
+        name: {**backend.stats, "circuit_open": backend.breaker.is_open}
+        for name, backend in sorted(_BACKENDS.items())
+    }
+
+
+def print_resilience_report():
+    """
+    Prints retry counts and time spent waiting per backend.
+    """
+    if not _BACKENDS:
+        return
+    print("🛡️  Backend retries and waits:")
+    for name, backend in sorted(_BACKENDS.items()):
+        s = backend.stats
+        state = "OPEN" if backend.breaker.is_open else "closed"
+        print(f"   {name:<18} calls={s['calls']:<4} retries={s['retries']:<3} failures={s['failures']:<3} "
+              f"skipped={s['skipped']:<3} rate_wait={s['rate_wait']:6.1f}s backoff_wait={s['backoff_wait']:6.1f}s "
+              f"circuit={state}")
@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far, in MB (None if unknown).
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class RunMetrics:
+    """
+    Collects per-stage timings, row counts and API call counts for one run
+    and writes them as a JSON report (and optionally a Prometheus textfile).
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.events = []
+        self.counters = {}
+        self.sections = {}
+        self.status = "running"
+        self.error = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, rows_in=None, **labels):
+        """
+        Times the enclosed block as one occurrence of stage `name`. The
+        yielded dict can be filled in with `rows_out`, `api_calls` or any
+        extra detail before the block ends.
+        """
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None, "api_calls": 0, **labels}
+        started = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = str(e)
+            raise
+        finally:
+            record["seconds"] = round(time.perf_counter() - started, 4)
+            record["peak_rss_mb"] = peak_rss_mb()
+            with self._lock:
+                self.events.append(record)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def attach(self, section, data):
+        """
+        Adds a free-form section (e.g. Sheets or backend stats) to the report.
+        """
+        with self._lock:
+            self.sections[section] = data
+
+    def summary(self):
+        stages = {}
+        for record in self.events:
+            entry = stages.setdefault(record["stage"], {
+                "count": 0, "seconds_total": 0.0, "seconds_max": 0.0,
+                "rows_in": 0, "rows_out": 0, "api_calls": 0, "errors": 0,
+            })
+            entry["count"] += 1
+            entry["seconds_total"] = round(entry["seconds_total"] + record["seconds"], 4)
+            entry["seconds_max"] = max(entry["seconds_max"], record["seconds"])
+            entry["rows_in"] += record["rows_in"] or 0
+            entry["rows_out"] += record["rows_out"] or 0
+            entry["api_calls"] += record["api_calls"] or 0
+            entry["errors"] += 1 if "error" in record else 0
+        return stages
+
+    def report(self):
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": self.status,
+            "error": self.error,
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.summary(),
+            "counters": dict(self.counters),
+            **self.sections,
+            "events": list(self.events),
+        }
+
+    def write_json(self, path):
+        report = self.report()
+        _write_atomic(path, json.dumps(report, indent=2, default=str))
+        print(f"🧾 Run report written to {path}")
+        return report
+
+    def write_prometheus(self, path, prefix="job_bot"):
+        """
+        Writes the stage summary in the Prometheus textfile-collector format.
+        """
+        report = self.report()
+        lines = [
+            f"# TYPE {prefix}_run_wall_seconds gauge",
+            f"{prefix}_run_wall_seconds {report['wall_seconds']}",
+            f"# TYPE {prefix}_run_success gauge",
+            f"{prefix}_run_success {1 if report['status'] == 'success' else 0}",
+            f"# TYPE {prefix}_run_last_timestamp_seconds gauge",
+            f"{prefix}_run_last_timestamp_seconds {int(time.time())}",
+        ]
+        if report["peak_rss_mb"] is not None:
+            lines += [f"# TYPE {prefix}_peak_rss_megabytes gauge", f"{prefix}_peak_rss_megabytes {report['peak_rss_mb']}"]
+
+        for metric, key in (("stage_seconds", "seconds_total"), ("stage_calls", "count"), ("stage_rows_in", "rows_in"),
+                            ("stage_rows_out", "rows_out"), ("stage_api_calls", "api_calls"), ("stage_errors", "errors")):
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            for stage, entry in sorted(report["stages"].items()):
+                lines.append(f'{prefix}_{metric}{{stage="{stage}"}} {entry[key]}')
+
+        for name, value in sorted(report["counters"].items()):
+            metric = re.sub(r"[^a-zA-Z0-9_]", "_", name)
+            lines += [f"# TYPE {prefix}_{metric} gauge", f"{prefix}_{metric} {value}"]
+
+        _write_atomic(path, "\n".join(lines) + "\n")
+        print(f"🧾 Prometheus metrics written to {path}")
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# Metrics of the current process, shared by every module of the job bot
+METRICS = RunMetrics()
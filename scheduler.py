@@ -0,0 +1,116 @@
+import time
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+@dataclass(frozen=True)
+class ScrapeTask:
+    """
+    One cell of the (term, location, site group) scrape grid.
+    """
+    term: str
+    location: str
+    group: str
+    sites: tuple = field(default=(), compare=False)
+    hours_old: int = field(default=None, compare=False)
+
+
+@dataclass
+class TaskResult:
+    """
+    Outcome of a single ScrapeTask, with timings.
+    `index` is the position of the task in the submitted grid and is used to
+    merge results in a stable order regardless of completion order.
+    """
+    task: ScrapeTask
+    index: int
+    value: object = None
+    error: Exception = None
+    queued: float = 0.0
+    elapsed: float = 0.0
+    rows: int = 0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _run_timed(worker, task, index, submitted_at):
+    started = time.perf_counter()
+    result = TaskResult(task=task, index=index, queued=started - submitted_at)
+    try:
+        result.value = worker(task)
+        result.rows = len(result.value) if hasattr(result.value, "__len__") else 0
+    except Exception as e:
+        result.error = e
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def iter_grid(tasks, worker, group_caps, default_cap=1):
+    """
+    Runs `worker(task)` for every task, fanning out over one thread pool per
+    site group so each group gets its own concurrency cap (e.g. LinkedIn = 1).
+    Yields TaskResults in completion order; exceptions are captured on the
+    TaskResult instead of being raised. Nothing is kept once a result has
+    been yielded, so the caller decides how much of each value to hold on to.
+    """
+    executors = {}
+    futures = []
+    try:
+        for index, task in enumerate(tasks):
+            executor = executors.get(task.group)
+            if executor is None:
+                cap = max(1, int(group_caps.get(task.group, default_cap)))
+                executor = ThreadPoolExecutor(max_workers=cap, thread_name_prefix=f"scrape-{task.group}")
+                executors[task.group] = executor
+            futures.append(executor.submit(_run_timed, worker, task, index, time.perf_counter()))
+
+        # as_completed drops each future once yielded; our list must not keep them alive
+        completed = as_completed(futures)
+        futures = None
+        for future in completed:
+            yield future.result()
+    finally:
+        # Only pending tasks are cancelled, when the caller stops early
+        for executor in executors.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def run_grid(tasks, worker, group_caps, default_cap=1):
+    """
+    Like iter_grid, but waits for every task and returns the results sorted
+    by their position in `tasks`.
+    """
+    return sorted(iter_grid(tasks, worker, group_caps, default_cap), key=lambda r: r.index)
+
+
+def print_timing_report(results, wall_time=None):
+    """
+    Prints per-task timings and a per-group summary so group caps can be sized.
+    """
+    if not results:
+        return
+
+    print("\n⏱️  Scrape timings:")
+    for r in results:
+        status = "ok" if r.ok else f"error: {r.error}"
+        print(f"   {r.task.group:<10} {r.task.location:<10} {r.task.term[:35]:<35} "
+              f"{r.elapsed:6.1f}s (queued {r.queued:5.1f}s) rows={r.rows} {status}")
+
+    groups = {}
+    for r in results:
+        groups.setdefault(r.task.group, []).append(r)
+
+    print("   --- per group ---")
+    for group, group_results in groups.items():
+        busy = sum(r.elapsed for r in group_results)
+        slowest = max(r.elapsed for r in group_results)
+        failed = sum(1 for r in group_results if not r.ok)
+        print(f"   {group:<10} tasks={len(group_results)} failed={failed} "
+              f"busy={busy:.1f}s mean={busy / len(group_results):.1f}s max={slowest:.1f}s")
+
+    if wall_time is not None:
+        busy_total = sum(r.elapsed for r in results)
+        speedup = busy_total / wall_time if wall_time > 0 else 0
+        print(f"   wall={wall_time:.1f}s busy={busy_total:.1f}s (x{speedup:.1f} parallelism)")
@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+import disk_cache
+
+
+class ScrapeCache:
+    """
+    On-disk cache of raw scrape_jobs results, one Parquet file per
+    (site group, search term, location, hours_old) key.
+
+    Entries older than `ttl_hours` are ignored and removed; once the cache
+    grows past `max_bytes` the least recently used entries are evicted.
+    `enabled=False` bypasses the cache entirely (--no-cache); `refresh=True`
+    skips lookups but still stores fresh results (--refresh).
+    """
+
+    def __init__(self, cache_dir, ttl_hours=12, max_bytes=200 * 1024 * 1024, enabled=True, refresh=False):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, task, hours_old, results_wanted):
+        key = json.dumps([
+            task.group, sorted(task.sites), task.term.strip().lower(),
+            task.location.strip().lower(), hours_old, results_wanted,
+        ])
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.parquet")
+
+    def get(self, task, hours_old, results_wanted):
+        """
+        Returns the cached DataFrame for the key, or None on a miss.
+        """
+        if not self.enabled or self.refresh:
+            return None
+
+        path = self._path(task, hours_old, results_wanted)
+        try:
+            if disk_cache.expired(path, self.ttl_seconds):
+                os.remove(path)
+                raise FileNotFoundError(path)
+            jobs = pd.read_parquet(path)
+            disk_cache.touch(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            print(f"   ⚠️ Ignoring unreadable cache entry {os.path.basename(path)}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return jobs
+
+    def put(self, task, hours_old, results_wanted, jobs):
+        """
+        Stores a scrape result. Failures to write are reported, not raised.
+        """
+        if not self.enabled:
+            return
+
+        path = self._path(task, hours_old, results_wanted)
+        try:
+            disk_cache.write_atomic(path, lambda tmp_path: to_parquet_safe(jobs).to_parquet(tmp_path, index=False))
+        except Exception as e:
+            print(f"   ⚠️ Could not cache scrape result: {e}")
+            return
+
+        self.evict()
+
+    def evict(self):
+        """
+        Drops expired entries, then least recently used ones until the cache
+        fits in max_bytes.
+        """
+        with self._lock:
+            disk_cache.evict(self.cache_dir, ".parquet", ttl_seconds=self.ttl_seconds, max_bytes=self.max_bytes)
+
+    def summary(self):
+        if not self.enabled:
+            return "Scrape cache disabled"
+        mode = " (refresh)" if self.refresh else ""
+        return f"Scrape cache{mode}: {self.hits} hits, {self.misses} misses"
+
+
+def to_parquet_safe(jobs):
+    """
+    jobspy returns object columns with mixed Python types, which Parquet
+    rejects. Store them as strings, keeping missing values missing.
+    """
+    jobs = jobs.copy()
+    for column in jobs.columns:
+        if jobs[column].dtype == object:
+            jobs[column] = jobs[column].where(jobs[column].isna(), jobs[column].astype(str))
+    return jobs
@@ -0,0 +1,102 @@
+import os
+import json
+import math
+from datetime import datetime, timezone
+from query_planner import normalize_term
+
+
+class ScrapeWindow:
+    """
+    Chooses hours_old per (search term, site group) from the last run in
+    which that scrape succeeded, so a run an hour after the previous one
+    asks only for the last few hours instead of the full retention window.
+
+    hours_old = hours since that run + `overlap_hours`, rounded up to a
+    multiple of `step_hours` (so a rerun shortly after a failure reuses the
+    scrape cache) and clamped to [step_hours, max_hours]. Scrapes never seen
+    before, or last seen longer ago than `max_hours`, get `max_hours`.
+
+    Successful scrapes are only remembered in memory by mark(); save()
+    writes them to disk and must be called once the results are safely in
+    the sheets, so a run that fails later is scraped again in full. Results
+    served from the scrape cache may be older than the run, so they do not
+    move the window forward either.
+    """
+
+    def __init__(self, path, max_hours, overlap_hours=6, step_hours=6, enabled=True, now=None):
+        self.path = path
+        self.max_hours = max_hours
+        self.overlap_hours = overlap_hours
+        self.step_hours = step_hours
+        self.enabled = enabled
+        # Everything scraped in this run was posted before the run started
+        self.started_at = now or datetime.now(timezone.utc)
+        self.last_success = self._load() if enabled else {}
+        self.succeeded = set()
+        self.failed = set()
+        self.cached = set()
+        # Scrapes whose last success is older than max_hours: postings from
+        # the gap that are already past the sheets' retention are not fetched
+        self.stale = set()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return {key: datetime.fromisoformat(value) for key, value in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"⚠️ Ignoring corrupt scrape window file {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def key(term, group):
+        return f"{normalize_term(term)}|{group}"
+
+    def hours_old(self, term, group):
+        last = self.last_success.get(self.key(term, group))
+        if not self.enabled or last is None:
+            return self.max_hours
+
+        elapsed = (self.started_at - last).total_seconds() / 3600
+        if elapsed > self.max_hours:
+            self.stale.add(self.key(term, group))
+        hours = math.ceil((max(0.0, elapsed) + self.overlap_hours) / self.step_hours) * self.step_hours
+        return max(self.step_hours, min(self.max_hours, hours))
+
+    def mark(self, term, group, ok=True, cached=False):
+        """
+        Records the outcome of one of this run's scrapes of (term, group).
+        The pair only counts as succeeded if it did not fail in any location
+        and no location was served from the cache.
+        """
+        if ok and cached:
+            self.cached.add(self.key(term, group))
+        else:
+            (self.succeeded if ok else self.failed).add(self.key(term, group))
+
+    def save(self):
+        """
+        Atomically writes the run's start time for every scrape marked as
+        succeeded, keeping older entries for the rest.
+        """
+        succeeded = self.succeeded - self.failed - self.cached
+        if not self.enabled or not succeeded:
+            return
+        for key in succeeded:
+            self.last_success[key] = self.started_at
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({key: value.isoformat() for key, value in self.last_success.items()}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.succeeded, self.failed, self.cached = set(), set(), set()
+
+    def summary(self, tasks):
+        """
+        {hours_old: number of tasks} for the run report.
+        """
+        counts = {}
+        for task in tasks:
+            counts[task.hours_old] = counts.get(task.hours_old, 0) + 1
+        return dict(sorted(counts.items()))
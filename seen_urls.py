@@ -0,0 +1,139 @@
+import os
+import math
+import json
+import hashlib
+from datetime import datetime, timezone
+
+
+class BloomFilter:
+    """
+    Fixed-size set of strings with no false negatives and a false positive
+    rate of about `error_rate` once `capacity` items have been added.
+    """
+
+    def __init__(self, capacity, error_rate=0.001, bits=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class SeenUrls:
+    """
+    Persistent record of job URLs already ingested by earlier runs, so they
+    can be dropped before the relevance filter. URLs are recorded per scope
+    (the sheet that ingested them), so a posting kept by one sheet, or
+    dropped as irrelevant, is still new to every other sheet. Two Bloom filter
+    generations are kept: URLs go into the current one, which becomes the
+    previous one after `rotate_hours`, so URLs are forgotten after one to
+    two rotations and the filters never fill up.
+
+    Like ScrapeWindow, new URLs are only staged by add(); save() records
+    them once the run's sheet writes have succeeded. Callers add only the
+    URLs that passed the filter into a sheet.
+    """
+
+    def __init__(self, path, rotate_hours, capacity=200_000, error_rate=0.001, enabled=True):
+        self.path = path
+        self.rotate_hours = rotate_hours
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.enabled = enabled
+        self.staged = []
+        self.dropped = 0
+        self.created_at = datetime.now(timezone.utc)
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = None
+        if enabled:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(f"{self.path}.json") as f:
+                meta = json.load(f)
+            with open(self.path, "rb") as f:
+                data = f.read()
+            filters = []
+            offset = 0
+            for generation in meta["generations"]:
+                bloom = BloomFilter(meta["capacity"], meta["error_rate"])
+                size = len(bloom.bits)
+                bloom.bits = bytearray(data[offset:offset + size])
+                bloom.count = generation["count"]
+                offset += size
+                filters.append(bloom)
+            self.capacity, self.error_rate = meta["capacity"], meta["error_rate"]
+            self.created_at = datetime.fromisoformat(meta["created_at"])
+            self.current = filters[0]
+            self.previous = filters[1] if len(filters) > 1 else None
+        except FileNotFoundError:
+            return
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"⚠️ Ignoring corrupt seen-URL filter {self.path}: {e}")
+
+    @staticmethod
+    def key(scope, url):
+        return f"{scope}\t{url}"
+
+    def __contains__(self, key):
+        if not self.enabled:
+            return False
+        return key in self.current or (self.previous is not None and key in self.previous)
+
+    def unseen(self, urls, scope=""):
+        """
+        Boolean list: True for URLs not ingested into `scope` by an earlier run.
+        """
+        mask = [self.key(scope, url) not in self for url in urls]
+        self.dropped += mask.count(False)
+        return mask
+
+    def add(self, urls, scope=""):
+        """
+        Stages URLs ingested into `scope` in this run; they are recorded by save().
+        """
+        if self.enabled:
+            self.staged.extend(self.key(scope, url) for url in urls)
+
+    def save(self):
+        if not self.enabled:
+            return
+        now = datetime.now(timezone.utc)
+        if (now - self.created_at).total_seconds() > self.rotate_hours * 3600 or self.current.count >= self.capacity:
+            self.previous, self.current = self.current, BloomFilter(self.capacity, self.error_rate)
+            self.created_at = now
+        for url in self.staged:
+            self.current.add(url)
+        self.staged = []
+
+        generations = [self.current] + ([self.previous] if self.previous is not None else [])
+        meta = {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "created_at": self.created_at.isoformat(),
+            "generations": [{"count": bloom.count} for bloom in generations],
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.tmp", "wb") as f:
+            for bloom in generations:
+                f.write(bloom.bits)
+        with open(f"{self.path}.json.tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f"{self.path}.tmp", self.path)
+        os.replace(f"{self.path}.json.tmp", f"{self.path}.json")
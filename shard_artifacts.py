@@ -0,0 +1,101 @@
+import os
+import re
+import json
+import shutil
+import pandas as pd
+from scrape_cache import to_parquet_safe
+
+MANIFEST = "manifest.json"
+
+
+def parse_shard(spec):
+    """
+    Parses "i/N" (1-based) into (i, N).
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec or "")
+    if not match:
+        raise ValueError(f"Shard must look like 'i/N', got {spec!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def _file_name(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "sheet"
+
+
+def write_shard(out_dir, label, manifest, sheet_jobs, term_urls, telegram_jobs):
+    """
+    Writes one shard's results to `out_dir/label/`: a Parquet file per
+    sheet with the filtered rows, the raw job_urls scraped per term, the
+    Telegram matches (if this shard scanned Telegram) and a manifest with
+    the shard's selection and the state the merge step has to commit. The
+    manifest is written last, so a shard directory without one is
+    incomplete.
+    """
+    shard_dir = os.path.join(out_dir, label)
+    if os.path.isdir(shard_dir):
+        shutil.rmtree(shard_dir)
+    os.makedirs(shard_dir)
+
+    sheets = {}
+    for sheet_name, jobs in sheet_jobs.items():
+        file_name = f"sheet-{_file_name(sheet_name)}.parquet"
+        to_parquet_safe(jobs).to_parquet(os.path.join(shard_dir, file_name), index=False)
+        sheets[sheet_name] = {"file": file_name, "rows": len(jobs)}
+
+    urls = pd.DataFrame(
+        [(term, url) for term, term_list in term_urls.items() for url in term_list],
+        columns=["term", "job_url"],
+    )
+    urls.to_parquet(os.path.join(shard_dir, "term_urls.parquet"), index=False)
+
+    telegram_file = None
+    if telegram_jobs is not None:
+        telegram_file = "telegram.parquet"
+        to_parquet_safe(telegram_jobs).to_parquet(os.path.join(shard_dir, telegram_file), index=False)
+
+    manifest = {**manifest, "label": label, "sheets": sheets, "telegram_file": telegram_file}
+    tmp_path = os.path.join(shard_dir, f"{MANIFEST}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(tmp_path, os.path.join(shard_dir, MANIFEST))
+    print(f"📦 Wrote shard '{label}' to {shard_dir} ({sum(s['rows'] for s in sheets.values())} rows)")
+    return shard_dir
+
+
+def read_shards(in_dir):
+    """
+    Loads every complete shard under `in_dir` (searched recursively, so
+    downloaded CI artifacts can be nested), ordered by shard index and
+    label. Returns a list of manifests with the data attached:
+    `sheet_jobs` {sheet: DataFrame}, `term_urls` {term: [url]} and
+    `telegram_jobs` (DataFrame or None).
+    """
+    shards = []
+    for root, _, files in os.walk(in_dir):
+        if MANIFEST not in files:
+            if any(name.endswith(".parquet") for name in files):
+                print(f"⚠️ Skipping incomplete shard in {root} (no {MANIFEST})")
+            continue
+        with open(os.path.join(root, MANIFEST)) as f:
+            shard = json.load(f)
+        shard["sheet_jobs"] = {
+            sheet_name: pd.read_parquet(os.path.join(root, entry["file"]))
+            for sheet_name, entry in shard["sheets"].items()
+        }
+        urls = pd.read_parquet(os.path.join(root, "term_urls.parquet"))
+        shard["term_urls"] = {term: group["job_url"].tolist() for term, group in urls.groupby("term", sort=False)}
+        shard["telegram_jobs"] = (
+            pd.read_parquet(os.path.join(root, shard["telegram_file"])) if shard.get("telegram_file") else None
+        )
+        shards.append(shard)
+
+    shards.sort(key=lambda shard: (shard.get("index") or 0, shard["label"]))
+    counts = {shard["count"] for shard in shards if shard.get("count")}
+    for count in counts:
+        missing = sorted(set(range(1, count + 1)) - {shard["index"] for shard in shards if shard.get("count") == count})
+        if missing:
+            print(f"⚠️ Missing shards {missing} of {count}; their terms are not written and will be scraped in full next run.")
+    return shards
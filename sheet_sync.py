@@ -0,0 +1,136 @@
+# Pushes the job store's state for a sheet to Google Sheets. `session` is a
+# sheets_session.SheetsSession and `store` a job_store.JobStore; main.py
+# passes the run's shared ones.
+
+# New rows are written with one append per sheet per run, split only when a
+# request would exceed these limits (Sheets recommends payloads under ~2 MB)
+APPEND_CHUNK_ROWS = 1000
+APPEND_CHUNK_BYTES = 1_500_000
+
+
+def contiguous_ranges(positions):
+    """
+    Groups sorted positions into [start, end) runs, e.g. [1, 2, 3, 7] -> [(1, 4), (7, 8)].
+    """
+    ranges = []
+    for position in positions:
+        if ranges and ranges[-1][1] == position:
+            ranges[-1] = (ranges[-1][0], position + 1)
+        else:
+            ranges.append((position, position + 1))
+    return ranges
+
+
+def sheet_headers(rows, headers=None):
+    # Existing headers first, then any new column in first-seen order
+    headers = list(headers or [])
+    for row in rows:
+        for column in row:
+            if column not in headers:
+                headers.append(column)
+    return headers
+
+
+def chunk_rows(rows, headers, max_rows=None, max_bytes=None):
+    """
+    Turns job dicts into sheet rows aligned to `headers` and yields them in
+    chunks of (job_url, values) pairs small enough for one append request.
+    """
+    max_rows = max_rows or APPEND_CHUNK_ROWS
+    max_bytes = max_bytes or APPEND_CHUNK_BYTES
+    chunk, chunk_bytes = [], 0
+    for row in rows:
+        values = [str(row.get(column, '')) for column in headers]
+        # Rough JSON size: the text plus quotes and a comma per cell
+        row_bytes = sum(len(value.encode("utf-8")) + 3 for value in values)
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + row_bytes > max_bytes):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append((row["job_url"], values))
+        chunk_bytes += row_bytes
+    if chunk:
+        yield chunk
+
+
+def sync_sheet(session, store, sheet_name):
+    """
+    Pushes the job store's net changes for `sheet_name` to Google Sheets:
+    expired rows are deleted with a single batch_update and pending jobs are
+    appended, aligned to the sheet's header row. Only the header row and the
+    job_url column are downloaded to locate rows.
+    """
+    expiring = store.expiring_urls(sheet_name)
+    pending = store.pending_rows(sheet_name)
+    if not expiring and not pending:
+        print(f"Sheet '{sheet_name}' is already up to date.")
+        return
+
+    sheet = session.worksheet(sheet_name)
+    headers = sheet.row_values(1)
+    sheet_urls = []
+    if 'job_url' in headers:
+        sheet_urls = [str(url) for url in sheet.col_values(headers.index('job_url') + 1)[1:]]
+
+    # 1. Delete expired rows. sheet_urls[i] is sheet row i + 2, i.e. 0-based
+    # grid index i + 1. Delete bottom-up so indexes stay valid.
+    if expiring:
+        positions = [i for i, url in enumerate(sheet_urls) if url in expiring]
+        if positions:
+            ranges = contiguous_ranges(positions)
+            requests = [
+                {"deleteDimension": {"range": {
+                    "sheetId": sheet.id,
+                    "dimension": "ROWS",
+                    "startIndex": start + 1,
+                    "endIndex": end + 1,
+                }}}
+                for start, end in reversed(ranges)
+            ]
+            print(f"   -> Removing {len(positions)} expired rows in {len(ranges)} ranges...")
+            session.spreadsheet.batch_update({"requests": requests})
+            sheet_urls = [url for url in sheet_urls if url not in expiring]
+        store.mark_removed(sheet_name, expiring)
+
+    # 2. Append pending jobs. Rows already in the sheet (e.g. a run that died
+    # between appending and recording it) are only marked as synced.
+    in_sheet = set(sheet_urls)
+    already_there = [row["job_url"] for row in pending if row["job_url"] in in_sheet]
+    to_append = [row for row in pending if row["job_url"] not in in_sheet]
+    if already_there:
+        store.mark_synced(sheet_name, already_there)
+
+    if to_append:
+        if not headers:
+            headers = sheet_headers(to_append)
+            sheet.insert_row(headers, 1)
+        elif len(sheet_headers(to_append, headers)) > len(headers):
+            # New columns (e.g. alternate_urls) go to the right of the existing ones
+            headers = sheet_headers(to_append, headers)
+            if len(headers) > sheet.col_count:
+                sheet.add_cols(len(headers) - sheet.col_count)
+            sheet.update(range_name="A1", values=[headers])
+        chunks = list(chunk_rows(to_append, headers))
+        for chunk in chunks:
+            sheet.append_rows([values for _, values in chunk])
+            store.mark_synced(sheet_name, [url for url, _ in chunk])
+        print(f"✅ Added {len(to_append)} new jobs to sheet '{sheet_name}' in {len(chunks)} append(s).")
+    else:
+        print(f"No NEW jobs found for '{sheet_name}' (all duplicates).")
+
+    missing = store.synced_urls(sheet_name) - in_sheet - set(row["job_url"] for row in to_append)
+    if sheet_urls and missing:
+        print(f"   ⚠️ {len(missing)} stored jobs are missing from '{sheet_name}' (edited by hand?). "
+              f"Run with --rebuild-sheets to restore it from the job store.")
+
+
+def rebuild_sheet(session, store, sheet_name):
+    """
+    Rewrites a sheet from the job store, e.g. after manual edits.
+    """
+    rows = store.active_rows(sheet_name)
+    sheet = session.worksheet(sheet_name)
+    headers = sheet_headers(rows, sheet.row_values(1))
+    print(f"♻️  Rebuilding '{sheet_name}' from the job store ({len(rows)} jobs)...")
+    sheet.clear()
+    sheet.update([headers] + [[str(row.get(column, '')) for column in headers] for row in rows])
+    store.mark_all_active_synced(sheet_name)
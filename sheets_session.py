@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+from resilience import get_backend
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+# Read-only gspread methods, retried on any transient error. Every other
+# method may write (append_rows, insert_row, batch_update, ...) and is only
+# retried when the request was refused, since a timeout or 5xx can arrive
+# after the write was applied and repeating it would duplicate or delete rows.
+READ_METHODS = {
+    "worksheet", "worksheets", "get_all_records", "get_all_values", "row_values", "col_values",
+    "get", "batch_get", "acell", "cell", "find", "findall", "fetch_sheet_metadata",
+}
+
+
+class _Timed:
+    """
+    Wraps a gspread Spreadsheet/Worksheet so every method call is counted
+    and timed on the owning session. Reads go through the backend's retrying
+    call(), writes through call_write(). Attributes pass through unchanged.
+    """
+
+    def __init__(self, session, target, prefix):
+        self._session = session
+        self._target = target
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        backend = self._session.backend
+        call = backend.call if name in READ_METHODS else backend.call_write
+
+        def timed_call(*args, **kwargs):
+            self._session.ensure_fresh()
+            started = time.perf_counter()
+            try:
+                return call(attr, *args, **kwargs)
+            finally:
+                self._session.record(f"{self._prefix}.{name}", time.perf_counter() - started)
+
+        return timed_call
+
+
+class SheetsSession:
+    """
+    Process-wide Google Sheets access: authorizes once, caches the
+    Spreadsheet and its Worksheet handles, refreshes the token only when it
+    has expired and keeps per-call latency counters. Every call goes through
+    the shared "sheets" backend, which keeps under the per-user quota and
+    retries 429s (honouring Retry-After); reads are also retried on 5xx
+    errors and timeouts.
+    """
+
+    def __init__(self, creds_file, sheet_id):
+        self.creds_file = creds_file
+        self.sheet_id = sheet_id
+        self.stats = {}
+        self._creds = None
+        self._client = None
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._lock = threading.RLock()
+        # 60 requests per minute per user, in bursts of up to 10
+        self.backend = get_backend("sheets", rate=1.0, burst=10, max_attempts=5, base_delay=2.0,
+                                   failure_threshold=5, passthrough=(gspread.WorksheetNotFound,))
+
+    def record(self, operation, seconds):
+        with self._lock:
+            entry = self.stats.setdefault(operation, {"calls": 0, "seconds": 0.0, "max": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+
+    def _timed(self, operation, fn, *args):
+        started = time.perf_counter()
+        try:
+            return self.backend.call(fn, *args)
+        finally:
+            self.record(operation, time.perf_counter() - started)
+
+    def _authorize(self):
+        if not os.path.exists(self.creds_file):
+            raise FileNotFoundError(f"Credentials file not found at {self.creds_file}")
+
+        self._creds = ServiceAccountCredentials.from_json_keyfile_name(self.creds_file, SCOPE)
+        self._client = self._timed("authorize", gspread.authorize, self._creds)
+
+    def ensure_fresh(self):
+        """
+        Re-authorizes only when the access token has expired. Cached handles
+        are dropped at the same time since they hold the old client.
+        """
+        with self._lock:
+            if self._client is None:
+                self._authorize()
+            elif getattr(self._creds, "access_token_expired", False):
+                print("🔑 Sheets token expired, re-authorizing...")
+                self._authorize()
+                self._spreadsheet = None
+                self._worksheets = {}
+
+    @property
+    def spreadsheet(self):
+        with self._lock:
+            self.ensure_fresh()
+            if self._spreadsheet is None:
+                self._spreadsheet = _Timed(self, self._timed("open_by_key", self._client.open_by_key, self.sheet_id), "spreadsheet")
+            return self._spreadsheet
+
+    def worksheet(self, sheet_name, create=True):
+        """
+        Returns the cached Worksheet handle for `sheet_name`, creating the
+        worksheet when it does not exist yet (unless `create=False`).
+        """
+        with self._lock:
+            spreadsheet = self.spreadsheet
+            if sheet_name not in self._worksheets:
+                try:
+                    worksheet = spreadsheet.worksheet(sheet_name)
+                except gspread.WorksheetNotFound:
+                    if not create:
+                        raise
+                    print(f"Worksheet '{sheet_name}' not found. Creating it...")
+                    worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
+                self._worksheets[sheet_name] = _Timed(self, worksheet, "worksheet")
+            return self._worksheets[sheet_name]
+
+    def api_calls(self):
+        return sum(entry["calls"] for entry in self.stats.values())
+
+    def print_stats(self):
+        """
+        Prints call counts and latency per Sheets operation.
+        """
+        if not self.stats:
+            return
+        print(f"📈 Google Sheets calls ({self.api_calls()} total):")
+        for operation, entry in sorted(self.stats.items(), key=lambda item: -item[1]["seconds"]):
+            mean = entry["seconds"] / entry["calls"]
+            print(f"   {operation:<28} calls={entry['calls']:<4} total={entry['seconds']:6.2f}s "
+                  f"mean={mean:5.2f}s max={entry['max']:5.2f}s")
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+
+# The disk cache helpers live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import disk_cache
+
+
+def normalize_topic(topic):
+    return " ".join(str(topic).lower().split())
+
+
+class ContentCache:
+    """
+    On-disk cache of generated post content, one JSON file per
+    (normalized topic, complexity).
+
+    Entries younger than `ttl_hours` are served instead of calling Gemini.
+    Older entries are kept, since get_stale() serves them when Gemini is
+    rate limited, until the cache holds more than `max_entries`. Then the
+    least recently used entries are evicted. `refresh=True` on a lookup
+    skips the cache, but the fresh result is still stored.
+    """
+
+    def __init__(self, cache_dir, ttl_hours=24 * 7, max_entries=500, enabled=True):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._lock = threading.Lock()
+
+    def _path(self, topic, complexity):
+        key = json.dumps([normalize_topic(topic), complexity])
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _read(self, topic, complexity, max_age=None):
+        if not self.enabled:
+            return None
+        path = self._path(topic, complexity)
+        try:
+            if max_age is not None and disk_cache.expired(path, max_age):
+                return None
+            with open(path) as f:
+                content = json.load(f)["content"]
+            disk_cache.touch(path)
+            return content
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable content cache entry {os.path.basename(path)}: {e}")
+            return None
+
+    def get(self, topic, complexity, refresh=False):
+        """
+        Returns content generated within the TTL, or None.
+        """
+        content = None if refresh else self._read(topic, complexity, self.ttl_seconds)
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return content
+
+    def get_stale(self, topic, complexity):
+        """
+        Returns the last content stored for the topic, however old, or None.
+        """
+        content = self._read(topic, complexity)
+        if content is not None:
+            with self._lock:
+                self.stale_hits += 1
+        return content
+
+    def put(self, topic, complexity, content):
+        """
+        Stores generated content. Failures to write are reported, not raised.
+        """
+        if not self.enabled:
+            return
+        path = self._path(topic, complexity)
+
+        def write(tmp_path):
+            with open(tmp_path, "w") as f:
+                json.dump({"topic": topic, "complexity": complexity, "content": content}, f)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            disk_cache.write_atomic(path, write)
+        except OSError as e:
+            print(f"⚠️ Could not cache content for '{topic}': {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        # No TTL here: expired entries are still served by get_stale()
+        with self._lock:
+            disk_cache.evict(self.cache_dir, ".json", max_entries=self.max_entries)
@@ -1,25 +1,46 @@
 import google.generativeai as genai
+import asyncio
 import json
 import os
+import sys
+
+# The shared retry / rate-limit helpers live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resilience import get_backend, is_retryable, CircuitOpenError
+from content_cache import ContentCache, normalize_topic
 
 # Configure API Key (User needs to set this)
 genai.configure(api_key=os.environ["GEMINI_API_KEY"])
 
-import time
+# gemini-2.0-flash free tier: 15 requests per minute. After repeated
+# failures Gemini is skipped for 5 minutes and posts fall back to mock data.
+GEMINI = get_backend("gemini", rate=15 / 60, burst=2, max_attempts=3, base_delay=10.0,
+                     max_delay=60.0, failure_threshold=3, reset_after=300)
+# Gemini requests the bot keeps open at once; the rest wait their turn
+MAX_CONCURRENT_REQUESTS = 2
 
-def generate_social_content(topic, complexity="Expert"):
-    """
-    Uses AI to generate a structured social media post from a topic.
-    """
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    
-    prompt = f"""
+# Generated posts are reused for a week; past that they are only served when Gemini is rate limited
+CONTENT_CACHE = ContentCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "content"),
+                             ttl_hours=24 * 7, max_entries=500)
+
+_model = None
+
+
+def _get_model():
+    global _model
+    if _model is None:
+        _model = genai.GenerativeModel('gemini-2.0-flash')
+    return _model
+
+
+def _build_prompt(topic, complexity):
+    return f"""
     You are an expert Social Media Manager for 'CodingBuddy360', a premier Medical Coding training institute.
-    
+
     Task: Create a value-packed social media post about: "{topic}"
     Target Audience: {complexity} level Medical Coders (Students to Professionals).
     Tone: Professional, Educational, Encouraging.
-    
+
     Format your response STRICTLY as logical JSON with no markdown formatting.
     The JSON must have these exact keys:
     {{
@@ -30,37 +51,123 @@ def generate_social_content(topic, complexity="Expert"):
         "tip_3": "Tip 3 (Max 20 words)",
         "caption": "A detailed caption for the post including hashtags. (Max 100 words)"
     }}
-    
+
     Ensure the tips are actionable and specific, not generic.
     """
-    
-    retries = 3
-    for attempt in range(retries):
-        try:
-            print(f"🔄 Attempt {attempt+1}/{retries}: Requesting AI content...")
-            response = model.generate_content(prompt)
-            # Clean up json if model returns markdown ticks
-            text = response.text.replace("```json", "").replace("```", "")
-            return json.loads(text)
-                
-        except Exception as e:
-            if "429" in str(e) or "Quota" in str(e):
-                print(f"⚠️ Rate Limit Hit. Waiting 20 seconds before retry...")
-                time.sleep(20)
-            else:
-                print(f"❌ Error generating content: {e}")
-                return None
-    
+
+
+def _parse_response(response):
+    # Clean up json if model returns markdown ticks
+    text = response.text.replace("```json", "").replace("```", "")
+    return json.loads(text)
+
+
+def _handle_error(e, topic, complexity):
+    """
+    Content to use when Gemini is rate limited or skipped: the last post
+    generated for the topic, else mock data. None for other errors.
+    """
+    if not (isinstance(e, CircuitOpenError) or is_retryable(e)):
+        print(f"❌ Error generating content: {e}")
+        return None
+    print(f"⚠️ Rate limited ({e}).")
+    stale = CONTENT_CACHE.get_stale(topic, complexity)
+    if stale is not None:
+        print("⚠️ All retries failed. Reusing the last post generated for this topic.")
+        return stale
     print("⚠️ All retries failed. Falling back to MOCK DATA for demonstration.")
+    return _mock_content(topic)
+
+
+def _cached(topic, complexity, refresh):
+    content = CONTENT_CACHE.get(topic, complexity, refresh)
+    if content is not None:
+        print(f"📦 Using cached content for '{topic}'")
+    return content
+
+
+def _mock_content(topic):
     return {
         "subtitle": "EXPERT INSIGHTS",
         "title": f"Mastering {topic} like a Pro",
         "tip_1": "Focus on the specific guidelines in Section I.C.",
         "tip_2": "Always cross-reference with the tabular list.",
         "tip_3": "Document your rationale for every complex code.",
-        "caption": f"Deep dive into {topic}! 🚀 Medical coding is all about precision. Here are 3 expert tips to help you navigate this complex area. #MedicalCoding #CodingBuddy360 #AAPC"
+        "caption": f"Deep dive into {topic}! 🚀 Medical coding is all about precision. Here are 3 expert tips to help you navigate this complex area. #MedicalCoding #CodingBuddy360 #AAPC",
+        # Lets callers tell placeholder posts from real ones
+        "mock": True,
     }
 
+
+def generate_social_content(topic, complexity="Expert", refresh=False):
+    """
+    Uses AI to generate a structured social media post from a topic.
+    Posts generated for the same topic within the cache TTL are reused
+    unless `refresh` is set.
+    """
+    cached = _cached(topic, complexity, refresh)
+    if cached is not None:
+        return cached
+    try:
+        print("🔄 Requesting AI content...")
+        # Rate-limited, with jittered backoff on 429s (see resilience.Backend)
+        response = GEMINI.call(_get_model().generate_content, _build_prompt(topic, complexity))
+        content = _parse_response(response)
+    except Exception as e:
+        return _handle_error(e, topic, complexity)
+    CONTENT_CACHE.put(topic, complexity, content)
+    return content
+
+
+# Per event loop: the concurrency limit and the requests in flight by topic
+_loop = None
+_semaphore = None
+_in_flight = {}
+
+
+def _bind_loop():
+    global _loop, _semaphore, _in_flight
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _loop, _semaphore, _in_flight = loop, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS), {}
+
+
+async def _generate_async(topic, complexity):
+    async with _semaphore:
+        try:
+            print("🔄 Requesting AI content...")
+            # Gemini runs in a worker thread; rate-limit and 429 backoff waits are asyncio sleeps
+            response = await GEMINI.acall(_get_model().generate_content, _build_prompt(topic, complexity))
+            content = _parse_response(response)
+        except Exception as e:
+            return _handle_error(e, topic, complexity)
+    CONTENT_CACHE.put(topic, complexity, content)
+    return content
+
+
+async def generate_social_content_async(topic, complexity="Expert", refresh=False):
+    """
+    generate_social_content for the event loop: never blocks it, runs at
+    most MAX_CONCURRENT_REQUESTS Gemini calls at once (queued behind the
+    shared Gemini rate limit), and callers asking for the same topic while
+    a request is in flight share its result.
+    """
+    cached = _cached(topic, complexity, refresh)
+    if cached is not None:
+        return cached
+    _bind_loop()
+    key = (normalize_topic(topic), complexity)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_generate_async(topic, complexity))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        print(f"🔗 Joining the request already running for '{topic}'")
+    # A caller that gives up must not cancel the request for the others
+    return await asyncio.shield(task)
+
+
 if __name__ == "__main__":
     # Test
     print(generate_social_content("Cardiology Coding"))
@@ -1,42 +1,161 @@
 import os
+import sys
+import time
+import base64
+import shutil
 import asyncio
-from playwright.async_api import async_playwright
+import hashlib
+import functools
 from jinja2 import Environment, FileSystemLoader
+from renderer import RENDERER, shutdown_renderer
 
-async def generate_image(data, output_filename="post.png"):
+# The disk cache helpers live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import disk_cache
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+OUTPUT_DIR = "social_bot/output"
+# Finished images keyed by a hash of the HTML they were rendered from
+IMAGE_CACHE_DIR = os.path.join(os.path.dirname(__file__), '.cache', 'images')
+
+# Supported output formats and their file extensions; quality (1-100) applies to JPEG and WebP
+IMAGE_FORMATS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+DEFAULT_QUALITY = 85
+
+# Retention for the image cache, which is the only place the bot's renders
+# are kept: images rendered longer ago than the age limit go first, then the
+# least recently used until under the size limit. OUTPUT_DIR holds
+# deliverables (batch posts and their resume markers, named files) and is
+# never pruned.
+IMAGE_CACHE_MAX_MB = 200
+IMAGE_CACHE_MAX_AGE_DAYS = 30
+PRUNE_INTERVAL_SECONDS = 60
+
+# Renders of the same HTML that are in progress, so concurrent duplicates share one screenshot
+_in_flight = {}
+_last_prune = 0.0
+
+
+@functools.lru_cache(maxsize=None)
+def _template(name='base.html'):
+    """
+    Compiled template with the stylesheet and logo inlined, so the page
+    needs nothing from disk. Built once per process.
+    """
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=False)
+    with open(os.path.join(TEMPLATE_DIR, 'style.css')) as f:
+        env.globals['styles'] = f.read()
+    with open(os.path.join(TEMPLATE_DIR, 'assets', 'logo.png'), 'rb') as f:
+        env.globals['logo_src'] = "data:image/png;base64," + base64.b64encode(f.read()).decode()
+    return env.get_template(name)
+
+
+def render_html(data):
+    return _template().render(**data)
+
+
+def image_format_for(filename):
+    """
+    Output format implied by a file name's extension (PNG if unknown).
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".jpeg":
+        return "jpeg"
+    return next((fmt for fmt, fmt_ext in IMAGE_FORMATS.items() if fmt_ext == ext), "png")
+
+
+def _screenshot_options(image_format, quality):
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format {image_format!r}; use one of {', '.join(IMAGE_FORMATS)}")
+    if image_format == "png":
+        return {"type": "png"}
+    return {"type": image_format, "quality": quality}
+
+
+async def _render_cached(html, image_format="png", quality=None):
+    """
+    (cached image path, image bytes or None, cache hit) for `html`,
+    screenshotting it on a miss. The bytes are only returned for a fresh
+    screenshot; cached images are left on disk.
+    """
+    options = _screenshot_options(image_format, quality)
+    key = hashlib.sha256(f"{html}\0{image_format}\0{options.get('quality')}".encode("utf-8")).hexdigest()
+    cached_path = os.path.join(IMAGE_CACHE_DIR, f"{key}{IMAGE_FORMATS[image_format]}")
+    if os.path.exists(cached_path):
+        disk_cache.touch(cached_path)
+        return cached_path, None, True
+    if key in _in_flight:
+        return (*await asyncio.shield(_in_flight[key]), True)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        image = await RENDERER.screenshot_html(html, **options)
+
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(image)
+
+        disk_cache.write_atomic(cached_path, write)
+        future.set_result((cached_path, image))
+        return cached_path, image, False
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Waiters get the error; mark it retrieved in case there are none
+        future.exception()
+        raise
+    finally:
+        del _in_flight[key]
+
+
+def prune_outputs(force=False):
+    """
+    Applies the retention limits to the image cache, at most once every
+    PRUNE_INTERVAL_SECONDS unless `force` is set.
+    """
+    global _last_prune
+    if not force and time.monotonic() - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return
+    _last_prune = time.monotonic()
+    removed = disk_cache.evict(IMAGE_CACHE_DIR, tuple(IMAGE_FORMATS.values()),
+                               ttl_seconds=IMAGE_CACHE_MAX_AGE_DAYS * 86400,
+                               max_bytes=IMAGE_CACHE_MAX_MB * 1024 * 1024)
+    if removed:
+        print(f"🧹 Removed {removed} old images from {IMAGE_CACHE_DIR}")
+
+
+async def render_image(data, image_format="jpeg", quality=DEFAULT_QUALITY):
+    """
+    Renders the HTML template with data and returns the encoded image
+    bytes without writing anything to OUTPUT_DIR.
+    """
+    cached_path, image, _ = await _render_cached(render_html(data), image_format, quality)
+    if image is None:
+        with open(cached_path, "rb") as f:
+            image = f.read()
+    prune_outputs()
+    return image
+
+
+async def generate_image(data, output_filename="post.png", image_format=None, quality=DEFAULT_QUALITY):
     """
     Renders the HTML template with data and saves it as an image.
+    The format follows the file extension unless `image_format` is given.
+    An identical post (same rendered HTML) is copied from the image cache
+    instead of being screenshotted again.
     """
-    # 1. Setup Jinja2 Environment
-    template_dir = os.path.join(os.path.dirname(__file__), 'templates')
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template('base.html')
-    
-    # 2. Render HTML
-    html_content = template.render(**data)
-    
-    # Save formatted temp file inside the templates folder so relative paths (css/assets) work
-    temp_file_path = os.path.join(template_dir, "temp.html")
-    with open(temp_file_path, "w") as f:
-        f.write(html_content)
-
-    # 3. Use Playwright to take a screenshot
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(viewport={'width': 1080, 'height': 1920})
-        
-        # Load the HTML
-        file_path = f"file://{temp_file_path}"
-        
-        await page.goto(file_path)
-        await page.wait_for_load_state('networkidle') # Wait for fonts/logo
-        
-        # Save Screenshot
-        output_path = os.path.join("social_bot/output", output_filename)
-        await page.screenshot(path=output_path)
-        print(f"Generated: {output_path}")
-        
-        await browser.close()
+    html_content = render_html(data)
+    cached_path, _, hit = await _render_cached(html_content, image_format or image_format_for(output_filename), quality)
+
+    output_path = os.path.join(OUTPUT_DIR, output_filename)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    shutil.copyfile(cached_path, output_path)
+    print(f"Generated: {output_path}" + (" (cached)" if hit else ""))
+    prune_outputs()
     
     return output_path
 
@@ -49,4 +168,11 @@ if __name__ == "__main__":
         "tip_2": "Bring your coding books (CPT, ICD) to demonstrate readiness.",
         "tip_3": "Practice explaining your logic for complex case studies."
     }
-    asyncio.run(generate_image(test_data, output_filename="debug_icons.png"))
+
+    async def _test():
+        try:
+            await generate_image(test_data, output_filename="debug_icons.png")
+        finally:
+            await shutdown_renderer()
+
+    asyncio.run(_test())
@@ -0,0 +1,231 @@
+import math
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+
+
+class QueueFull(Exception):
+    """
+    Raised by submit() when the queue already holds `max_queued` jobs.
+    """
+
+
+class Throttled(Exception):
+    """
+    Raised by submit() when a chat is over its limits. `retry_after` is
+    the number of seconds until it may submit again (0 if it has to wait
+    for one of its jobs to finish).
+    """
+
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    chat_id: int
+    topic: str
+    refresh: bool = False
+    # Whatever the stages need to report back (event, status message, ...)
+    context: dict = field(default_factory=dict)
+    content: dict = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    # Stage name -> seconds, filled in as the job moves through the queue
+    timings: dict = field(default_factory=dict)
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Nearest-rank percentiles of `values`, e.g. {"p50": 1.2, ...}.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {f"p{p}": None for p in points}
+    return {f"p{p}": ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] for p in points}
+
+
+class GenerateQueue:
+    """
+    Bounded two-stage queue for post generation. `content_workers` run
+    generate(job) (the LLM stage) and hand jobs to `render_workers` running
+    render(job), so the next post's content is written while the previous
+    one renders. The hand-off queue only holds one job per render worker,
+    so content never piles up far ahead of rendering.
+
+    Each chat may have `per_chat_pending` jobs queued or running and submit
+    at most `per_chat_limit` jobs per `per_chat_window` seconds.
+
+    generate() returns False to drop a job after reporting the problem
+    itself; exceptions from either stage go to on_error(job, exc).
+    """
+
+    def __init__(self, generate, render, on_error=None, content_workers=2, render_workers=2, max_queued=20,
+                 per_chat_pending=2, per_chat_limit=5, per_chat_window=600, history=500):
+        self.generate = generate
+        self.render = render
+        self.on_error = on_error
+        self.content_workers = content_workers
+        self.render_workers = render_workers
+        self.max_queued = max_queued
+        self.per_chat_pending = per_chat_pending
+        self.per_chat_limit = per_chat_limit
+        self.per_chat_window = per_chat_window
+        self.counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "throttled": 0}
+        self.latencies = {stage: deque(maxlen=history) for stage in ("wait", "generate", "render", "total")}
+        self.active = {"generate": 0, "render": 0}
+        self._pending = {}
+        self._submissions = {}
+        self._content_queue = None
+        self._render_queue = None
+        self._workers = []
+
+    async def start(self):
+        if self._workers:
+            return
+        self._content_queue = asyncio.Queue()
+        self._render_queue = asyncio.Queue(maxsize=self.render_workers)
+        self._workers = (
+            [asyncio.ensure_future(self._content_worker()) for _ in range(self.content_workers)]
+            + [asyncio.ensure_future(self._render_worker()) for _ in range(self.render_workers)]
+        )
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def join(self):
+        """
+        Waits until every submitted job has finished or failed.
+        """
+        await self._content_queue.join()
+        await self._render_queue.join()
+
+    @property
+    def depth(self):
+        """
+        Jobs waiting for a worker in either stage.
+        """
+        if self._content_queue is None:
+            return 0
+        return self._content_queue.qsize() + self._render_queue.qsize()
+
+    def submit(self, job):
+        """
+        Queues a job and returns its 1-based position in line, or raises
+        QueueFull / Throttled without queueing it.
+        """
+        if self._content_queue is None:
+            raise RuntimeError("GenerateQueue.start() has not been awaited")
+
+        now = time.monotonic()
+        recent = self._submissions.setdefault(job.chat_id, deque())
+        while recent and now - recent[0] > self.per_chat_window:
+            recent.popleft()
+        if self._pending.get(job.chat_id, 0) >= self.per_chat_pending:
+            self.counts["throttled"] += 1
+            raise Throttled(f"{self.per_chat_pending} posts are already in progress for this chat")
+        if len(recent) >= self.per_chat_limit:
+            self.counts["throttled"] += 1
+            raise Throttled(f"Limit of {self.per_chat_limit} posts per {self.per_chat_window // 60} minutes reached",
+                            retry_after=self.per_chat_window - (now - recent[0]))
+        if self._content_queue.qsize() >= self.max_queued:
+            self.counts["rejected"] += 1
+            raise QueueFull(f"{self._content_queue.qsize()} posts are already waiting")
+
+        recent.append(now)
+        self._pending[job.chat_id] = self._pending.get(job.chat_id, 0) + 1
+        self.counts["submitted"] += 1
+        job.submitted_at = now
+        self._content_queue.put_nowait(job)
+        return self._content_queue.qsize()
+
+    async def _fail(self, job, exc):
+        self.counts["failed"] += 1
+        print(f"❌ Job '{job.topic}' for chat {job.chat_id} failed: {exc}")
+        if self.on_error is not None:
+            try:
+                await self.on_error(job, exc)
+            except Exception as e:
+                print(f"⚠️ Could not report the failure to chat {job.chat_id}: {e}")
+
+    def _finish(self, job):
+        remaining = self._pending.get(job.chat_id, 1) - 1
+        if remaining:
+            self._pending[job.chat_id] = remaining
+        else:
+            self._pending.pop(job.chat_id, None)
+
+    def _record(self, job, stage, started):
+        job.timings[stage] = time.monotonic() - started
+        self.latencies[stage].append(job.timings[stage])
+
+    async def _content_worker(self):
+        while True:
+            job = await self._content_queue.get()
+            started = time.monotonic()
+            job.timings["wait"] = started - job.submitted_at
+            self.latencies["wait"].append(job.timings["wait"])
+            self.active["generate"] += 1
+            try:
+                keep = await self.generate(job)
+            except Exception as e:
+                keep = False
+                await self._fail(job, e)
+            finally:
+                self.active["generate"] -= 1
+                self._record(job, "generate", started)
+            if keep is False:
+                self._finish(job)
+            else:
+                # Blocks while every render worker is busy and the hand-off slot is taken
+                await self._render_queue.put(job)
+            self._content_queue.task_done()
+
+    async def _render_worker(self):
+        while True:
+            job = await self._render_queue.get()
+            started = time.monotonic()
+            self.active["render"] += 1
+            try:
+                await self.render(job)
+            except Exception as e:
+                await self._fail(job, e)
+            else:
+                self.counts["completed"] += 1
+                self.latencies["total"].append(time.monotonic() - job.submitted_at)
+            finally:
+                self.active["render"] -= 1
+                self._record(job, "render", started)
+                self._finish(job)
+                self._render_queue.task_done()
+
+    def stats(self):
+        """
+        Queue depth, counters and latency percentiles (seconds) over the
+        last `history` jobs.
+        """
+        return {
+            "queued": self._content_queue.qsize() if self._content_queue else 0,
+            "awaiting_render": self._render_queue.qsize() if self._render_queue else 0,
+            "active": dict(self.active),
+            **self.counts,
+            "latency": {stage: percentiles(values) for stage, values in self.latencies.items()},
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        lines = [
+            f"📊 Queue: {stats['queued']} waiting, {stats['awaiting_render']} awaiting render, "
+            f"{stats['active']['generate']} writing, {stats['active']['render']} rendering",
+            f"✅ {stats['completed']} done · ❌ {stats['failed']} failed · "
+            f"🚫 {stats['rejected']} rejected · ⏱️ {stats['throttled']} throttled",
+        ]
+        for stage, points in stats["latency"].items():
+            if points["p50"] is None:
+                continue
+            lines.append(f"{stage:<8} " + "  ".join(f"{name}={value:.1f}s" for name, value in points.items()))
+        return "\n".join(lines)
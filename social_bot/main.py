@@ -1,15 +1,21 @@
 import os
+import re
+import json
 import asyncio
+import hashlib
 import argparse
-from content_generator import generate_social_content
-from design_engine import generate_image
+from content_generator import generate_social_content_async, MAX_CONCURRENT_REQUESTS
+from content_cache import normalize_topic
+from design_engine import generate_image, OUTPUT_DIR, IMAGE_FORMATS, DEFAULT_QUALITY
+from renderer import shutdown_renderer, POOL_SIZE
+from job_queue import GenerateQueue, Job
 
-async def run_bot(topic):
+async def run_bot(topic, refresh=False):
     print(f"🤖 Bot Activated! Processing topic: '{topic}'")
     
     # 1. Generate Content
     print("✨ Generating expert content with AI...")
-    content = generate_social_content(topic)
+    content = await generate_social_content_async(topic, refresh=refresh)
     
     if not content:
         print("❌ AI Generation failed.")
@@ -29,9 +35,114 @@ async def run_bot(topic):
     print(content['caption'])
     print("---------------")
 
+
+def read_topics(path):
+    """
+    One topic per line; blank lines, '#' comments and repeated topics are skipped.
+    """
+    topics, seen = [], set()
+    with open(path) as f:
+        for line in f:
+            topic = line.strip()
+            if not topic or topic.startswith("#") or normalize_topic(topic) in seen:
+                continue
+            seen.add(normalize_topic(topic))
+            topics.append(topic)
+    return topics
+
+
+def topic_slug(topic):
+    """
+    Readable file name part for a topic. The hash keeps topics that only
+    differ in punctuation (or past the 60-character cut) apart.
+    """
+    normalized = normalize_topic(topic)
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^a-z0-9]+', '-', normalized).strip('-')[:60] or 'topic'}-{digest}"
+
+
+async def run_batch(topics_path, refresh=False, force=False, image_format="png", quality=DEFAULT_QUALITY):
+    """
+    Generates a post per topic in `topics_path`: content is written by
+    concurrent Gemini calls while earlier posts render on the warm
+    browser. Each topic gets post_<slug>.<ext> plus post_<slug>.json with
+    its content and caption; topics that already have both are skipped
+    unless `force` is set, so an interrupted run can simply be restarted.
+    """
+    topics = read_topics(topics_path)
+    ext = IMAGE_FORMATS[image_format]
+    outputs = {topic: os.path.join(OUTPUT_DIR, f"post_{topic_slug(topic)}") for topic in topics}
+    todo = [topic for topic in topics
+            if force or not (os.path.exists(outputs[topic] + ext) and os.path.exists(outputs[topic] + ".json"))]
+    print(f"🤖 Batch: {len(topics)} topics, {len(topics) - len(todo)} already done, {len(todo)} to generate")
+    if not todo:
+        return
+
+    done, failed = [], []
+
+    async def generate(job):
+        job.content = await generate_social_content_async(job.topic, refresh=job.refresh)
+        if not job.content or job.content.get("mock"):
+            # Placeholder posts are not saved, so the next run tries the topic again
+            print(f"❌ No content for '{job.topic}'; it will be retried next run.")
+            failed.append(job.topic)
+            return False
+        return True
+
+    async def render(job):
+        base = job.context["output"]
+        image_path = await generate_image(job.content, output_filename=os.path.basename(base) + ext,
+                                          image_format=image_format, quality=quality)
+        # Written last: a topic only counts as done once its .json exists
+        with open(base + ".json.tmp", "w") as f:
+            json.dump({"topic": job.topic, **job.content}, f, indent=2, ensure_ascii=False)
+        os.replace(base + ".json.tmp", base + ".json")
+        done.append(job.topic)
+        print(f"✅ [{len(done) + len(failed)}/{len(todo)}] {job.topic} -> {image_path}")
+
+    async def report_error(job, e):
+        failed.append(job.topic)
+
+    queue = GenerateQueue(generate, render, on_error=report_error,
+                          content_workers=MAX_CONCURRENT_REQUESTS, render_workers=POOL_SIZE,
+                          max_queued=len(todo), per_chat_pending=len(todo), per_chat_limit=len(todo))
+    await queue.start()
+    for topic in todo:
+        queue.submit(Job(0, topic, refresh, context={"output": outputs[topic]}))
+    try:
+        await queue.join()
+    finally:
+        await queue.stop()
+
+    print(f"\n🎉 Batch finished: {len(done)} posts created, {len(failed)} failed")
+    print(queue.format_stats())
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("topic", help="The topic to generate a post about")
+    parser.add_argument("topic", nargs="?", help="The topic to generate a post about")
+    parser.add_argument("--topics-file",
+                        help="Generate a post for every topic in this file (one per line) instead")
+    parser.add_argument("--force", action="store_true",
+                        help="With --topics-file, regenerate topics that already have output")
+    parser.add_argument("--format", choices=list(IMAGE_FORMATS), default="png",
+                        help="With --topics-file, image format of the posts")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY,
+                        help="JPEG/WebP quality (1-100)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Generate new content even if this topic was generated recently")
     args = parser.parse_args()
-    
-    asyncio.run(run_bot(args.topic))
+    if bool(args.topic) == bool(args.topics_file):
+        parser.error("give either a topic or --topics-file")
+
+    async def _run():
+        try:
+            if args.topics_file:
+                await run_batch(args.topics_file, refresh=args.refresh, force=args.force,
+                                image_format=args.format, quality=args.quality)
+            else:
+                await run_bot(args.topic, refresh=args.refresh)
+        finally:
+            await shutdown_renderer()
+
+    asyncio.run(_run())
@@ -0,0 +1,206 @@
+import time
+import base64
+import asyncio
+from playwright.async_api import async_playwright
+
+VIEWPORT = {"width": 1080, "height": 1920}
+# Warm pages kept open; also the number of renders that can run at once
+POOL_SIZE = 2
+# Pages are replaced after this many renders so a leak in one cannot grow forever
+MAX_RENDERS_PER_PAGE = 50
+
+
+class _Slot:
+    """
+    One pooled page with its own browser context.
+    """
+
+    def __init__(self, context=None, page=None, generation=-1):
+        self.context = context
+        self.page = page
+        self.generation = generation
+        self.renders = 0
+
+
+class Renderer:
+    """
+    Long-lived headless Chromium that renders pages to images.
+
+    The browser is launched once (by start(), or by the first render) and
+    a pool of `pool_size` warm pages is shared by concurrent renders. A page
+    is replaced after `max_renders` renders or as soon as a render on it
+    fails, and the browser is relaunched if it has crashed. A new event loop
+    (e.g. a second asyncio.run) gets a fresh browser.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, max_renders=MAX_RENDERS_PER_PAGE, viewport=VIEWPORT):
+        self.pool_size = pool_size
+        self.max_renders = max_renders
+        self.viewport = viewport
+        self.stats = {"renders": 0, "failures": 0, "recycled": 0, "launches": 0, "seconds": 0.0}
+        self._reset()
+
+    def _reset(self):
+        self._loop = None
+        self._lock = None
+        self._playwright = None
+        self._browser = None
+        self._slots = None
+        # Bumped on every launch; pages of an older browser are discarded
+        self._generation = 0
+
+    @property
+    def running(self):
+        return self._browser is not None and self._browser.is_connected()
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Objects bound to a previous (closed) loop cannot be reused
+            self._reset()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Queue()
+            for _ in range(self.pool_size):
+                self._slots.put_nowait(_Slot())
+
+    async def start(self):
+        """
+        Launches Chromium and fills the page pool, unless already running.
+        """
+        self._bind_loop()
+        async with self._lock:
+            if self.running:
+                return
+            if self._browser is not None:
+                print("⚠️ Renderer: browser is gone, relaunching Chromium...")
+                self._browser = None
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            started = time.perf_counter()
+            self._browser = await self._playwright.chromium.launch()
+            self._generation += 1
+            self.stats["launches"] += 1
+            print(f"🖥️  Renderer: Chromium ready in {time.perf_counter() - started:.1f}s ({self.pool_size} pages)")
+
+    async def _close_slot(self, slot):
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass  # The browser (or page) is already gone
+        slot.context = slot.page = None
+
+    async def _checkout(self):
+        self._bind_loop()
+        slot = await self._slots.get()
+        try:
+            await self.start()
+            stale = slot.generation != self._generation or slot.page is None or slot.page.is_closed()
+            if stale or slot.renders >= self.max_renders:
+                if slot.page is not None:
+                    self.stats["recycled"] += 1
+                await self._close_slot(slot)
+                slot.context = await self._browser.new_context(viewport=self.viewport)
+                slot.page = await slot.context.new_page()
+                slot.generation = self._generation
+                slot.renders = 0
+        except BaseException:
+            self._slots.put_nowait(slot)
+            raise
+        return slot
+
+    async def _capture(self, page, output_path, options):
+        if options.get("type") != "webp":
+            return await page.screenshot(path=output_path, **options)
+        # page.screenshot only encodes PNG and JPEG; Chromium's DevTools protocol also does WebP
+        params = {"format": "webp"}
+        if options.get("quality") is not None:
+            params["quality"] = options["quality"]
+        cdp = await page.context.new_cdp_session(page)
+        try:
+            result = await cdp.send("Page.captureScreenshot", params)
+        finally:
+            await cdp.detach()
+        image = base64.b64decode(result["data"])
+        if output_path:
+            with open(output_path, "wb") as f:
+                f.write(image)
+        return image
+
+    async def _render(self, load, output_path, screenshot_options):
+        for attempt in range(2):
+            slot = await self._checkout()
+            started = time.perf_counter()
+            try:
+                await load(slot.page)
+                image = await self._capture(slot.page, output_path, dict(screenshot_options))
+            except Exception as e:
+                self.stats["failures"] += 1
+                await self._close_slot(slot)
+                if attempt == 1:
+                    raise
+                print(f"⚠️ Renderer: render failed ({e}), retrying on a fresh page...")
+                continue
+            finally:
+                self._slots.put_nowait(slot)
+            slot.renders += 1
+            self.stats["renders"] += 1
+            self.stats["seconds"] += time.perf_counter() - started
+            return image
+
+    async def screenshot(self, url, output_path=None, **screenshot_options):
+        """
+        Opens `url` on a pooled page, waits for fonts and images and takes a
+        screenshot (written to `output_path` if given). Returns the image
+        bytes. `type` may be "png", "jpeg" or "webp" (with `quality` for the
+        latter two). A failed render is retried once on a fresh page.
+        """
+        async def load(page):
+            await page.goto(url, wait_until="networkidle")
+
+        return await self._render(load, output_path, screenshot_options)
+
+    async def screenshot_html(self, html, output_path=None, **screenshot_options):
+        """
+        Like screenshot(), for a self-contained HTML string. Waits for the
+        load event and web fonts instead of network idle; fonts fetched by
+        one render stay in the page's HTTP cache for the next ones.
+        """
+        async def load(page):
+            await page.set_content(html, wait_until="load")
+            await page.evaluate("document.fonts.ready.then(() => true)")
+
+        return await self._render(load, output_path, screenshot_options)
+
+    async def close(self):
+        """
+        Closes the browser and Playwright; the next render starts them again.
+        """
+        if self._loop is not asyncio.get_running_loop():
+            self._reset()
+            return
+        async with self._lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+            if self._playwright is not None:
+                await self._playwright.stop()
+        self._reset()
+
+
+# One renderer per process, shared by every generate_image call
+RENDERER = Renderer()
+
+
+async def start_renderer():
+    """
+    Warms up the shared renderer, e.g. when the bot starts.
+    """
+    await RENDERER.start()
+
+
+async def shutdown_renderer():
+    await RENDERER.close()
@@ -1,9 +1,12 @@
+import io
 import os
 import asyncio
 from telethon import TelegramClient, events
 from telethon.sessions import StringSession
-from content_generator import generate_social_content
-from design_engine import generate_image
+from content_generator import generate_social_content_async, MAX_CONCURRENT_REQUESTS
+from design_engine import render_image, IMAGE_FORMATS
+from renderer import start_renderer, shutdown_renderer, POOL_SIZE
+from job_queue import GenerateQueue, Job, QueueFull, Throttled
 
 import getpass
 
@@ -38,49 +41,109 @@ async def handler(event):
     """
     sender = await event.get_sender()
     topic = event.message.text.replace('/generate', '').strip()
+    # "/generate --fresh <topic>" skips the content cache
+    refresh = topic.startswith('--fresh')
+    if refresh:
+        topic = topic[len('--fresh'):].strip()
     
     if not topic:
         await event.reply("⚠️ Please provide a topic.\nExample: `/generate Medical Coding Tips`")
         return
 
-    # Notify user we are working
-    status_msg = await event.reply(f"🤖 **CodingSocialBuddy** is thinking about: '{topic}'...\n_(This takes ~15 seconds)_")
-
+    job = Job(event.chat_id, topic, refresh, context={"event": event})
     try:
-        # 1. Generate Content (with retry logic built-in)
-        content = generate_social_content(topic)
-        
-        if not content:
-            await status_msg.edit("❌ Failed to generate content (AI Rate Limit?). Please try again in a minute.")
-            return
-            
-        await status_msg.edit(f"✨ Content generated! Designing image now...")
-
-        # 2. Generate Design
-        image_path = await generate_image(content, output_filename=f"post_{event.id}.png")
-        
-        # 3. Send Result
-        caption_text = f"**{content['title']}**\n\n{content['caption']}\n\n_Generated by CodingSocialBuddy_"
-        
-        await client.send_file(
-            event.chat_id,
-            image_path,
-            caption=caption_text,
-            reply_to=event.id
-        )
-        
-        # Cleanup
-        await status_msg.delete()
-        # Optional: Remove local file to save space? 
-        # os.remove(image_path)
-        
-    except Exception as e:
-        await status_msg.edit(f"❌ Error: {str(e)}")
+        position = QUEUE.submit(job)
+    except Throttled as e:
+        wait = f" Try again in {max(1, round(e.retry_after / 60))} min." if e.retry_after else " Please wait for them to finish."
+        await event.reply(f"⏳ {e}.{wait}")
+        return
+    except QueueFull:
+        await event.reply("🚦 The bot is busy right now. Please try again in a few minutes.")
+        return
+
+    # Notify user we are working. Set before the next await so the worker can wait on it.
+    line = "next in line" if position <= 1 else f"#{position} in line"
+    job.context["status"] = asyncio.ensure_future(event.reply(
+        f"🤖 **CodingSocialBuddy** queued: '{topic}' ({line})...\n_(This takes ~15 seconds once it starts)_"))
+
+
+async def generate_stage(job):
+    """
+    LLM stage of the queue: writes the post content.
+    """
+    status_msg = await job.context["status"]
+    await status_msg.edit(f"🤖 **CodingSocialBuddy** is thinking about: '{job.topic}'...")
+
+    # 1. Generate Content (with retry logic built-in)
+    job.content = await generate_social_content_async(job.topic, refresh=job.refresh)
+
+    if not job.content:
+        await status_msg.edit("❌ Failed to generate content (AI Rate Limit?). Please try again in a minute.")
+        return False
+
+    await status_msg.edit(f"✨ Content generated! Designing image now...")
+    return True
+
+
+async def render_stage(job):
+    """
+    Render stage of the queue: designs the image and sends the post.
+    """
+    event = job.context["event"]
+    status_msg = await job.context["status"]
+    content = job.content
+
+    # 2. Generate Design (kept in memory; a compressed image uploads faster than a full-size PNG)
+    image = io.BytesIO(await render_image(content, image_format=POST_IMAGE_FORMAT, quality=POST_IMAGE_QUALITY))
+    image.name = f"post_{event.id}{IMAGE_FORMATS[POST_IMAGE_FORMAT]}"
+
+    # 3. Send Result
+    caption_text = f"**{content['title']}**\n\n{content['caption']}\n\n_Generated by CodingSocialBuddy_"
+
+    await client.send_file(
+        event.chat_id,
+        image,
+        caption=caption_text,
+        reply_to=event.id
+    )
+
+    # Cleanup
+    await status_msg.delete()
+
+
+async def report_error(job, e):
+    status_msg = await job.context["status"]
+    await status_msg.edit(f"❌ Error: {str(e)}")
+
+
+# Format of the images sent to chats: "jpeg", "webp" or "png"
+POST_IMAGE_FORMAT = os.environ.get("POST_IMAGE_FORMAT", "jpeg")
+POST_IMAGE_QUALITY = int(os.environ.get("POST_IMAGE_QUALITY", "85"))
+
+# One Gemini call per content worker and one warm page per render worker
+QUEUE = GenerateQueue(generate_stage, render_stage, on_error=report_error,
+                      content_workers=MAX_CONCURRENT_REQUESTS, render_workers=POOL_SIZE,
+                      max_queued=20, per_chat_pending=2, per_chat_limit=5, per_chat_window=600)
+
+
+@client.on(events.NewMessage(pattern='/stats'))
+async def stats_handler(event):
+    """
+    Replies to '/stats' with queue depth and latency percentiles.
+    """
+    await event.reply(QUEUE.format_stats())
 
 async def main():
     print("🤖 CodingSocialBuddy Bot is responding to commands...")
     await client.start()
-    await client.run_until_disconnected()
+    # Launch Chromium now so the first /generate doesn't pay for it
+    await start_renderer()
+    await QUEUE.start()
+    try:
+        await client.run_until_disconnected()
+    finally:
+        await QUEUE.stop()
+        await shutdown_renderer()
 
 if __name__ == '__main__':
     from telethon.sessions import StringSession
@@ -89,7 +152,14 @@ if __name__ == '__main__':
     
     # Attach handler again because re-init clears it
     client.add_event_handler(handler, events.NewMessage(pattern='/generate'))
+    client.add_event_handler(stats_handler, events.NewMessage(pattern='/stats'))
     
     print("--- Starting Bot ---")
     client.start()
-    client.run_until_disconnected()
+    client.loop.run_until_complete(start_renderer())
+    client.loop.run_until_complete(QUEUE.start())
+    try:
+        client.run_until_disconnected()
+    finally:
+        client.loop.run_until_complete(QUEUE.stop())
+        client.loop.run_until_complete(shutdown_renderer())
@@ -1,16 +1,204 @@
 from telethon.sync import TelegramClient
 from telethon.sessions import StringSession
+from telethon.errors import FloodWaitError
 import pandas as pd
 import os
+import json
+import asyncio
 import datetime
+import time
+from resilience import backoff_delay, retry_after_seconds
 
-async def scrape_telegram_jobs(api_id, api_hash, session_string, channels, search_terms):
+# Channels read in parallel within the one session
+MAX_CONCURRENT_CHANNELS = 4
+# A channel taking longer than this is abandoned so it cannot stall the run
+CHANNEL_TIMEOUT_SECONDS = 60
+# FloodWait handling: retries per channel, and the longest wait we accept.
+# Waits happen outside the channel timeout, which only covers reading.
+MAX_FLOOD_RETRIES = 2
+MAX_FLOOD_WAIT_SECONDS = 300
+# Messages read from a channel we have no high-water mark for yet
+INITIAL_MESSAGE_LIMIT = 200
+# Upper bound when catching up on a known channel (newer than its mark)
+MAX_MESSAGES_PER_CHANNEL = 2000
+
+
+def load_high_water_marks(path):
+    """
+    Loads {channel id: last seen message id} from the state file.
+    A missing or unreadable file means every channel starts fresh.
+    """
+    try:
+        with open(path) as f:
+            return {str(k): int(v) for k, v in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+    except (ValueError, TypeError) as e:
+        print(f"⚠️ Ignoring corrupt Telegram state file {path}: {e}")
+        return {}
+
+
+def save_high_water_marks(path, marks):
+    """
+    Atomically writes the high-water marks back to the state file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(marks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _normalize_search_configs(search_terms):
+    """
+    Accepts plain terms or SEARCH_CONFIGS-style dicts and returns a list of
+    (term, lowercased term, sheet_name) tuples in the given order.
+    """
+    configs = []
+    for entry in search_terms:
+        if isinstance(entry, dict):
+            term, sheet_name = entry["term"], entry.get("sheet_name")
+        else:
+            term, sheet_name = entry, None
+        configs.append((term, term.lower(), sheet_name))
+    return configs
+
+
+def match_message(text, search_configs):
+    """
+    Returns {sheet_name: term} for every sheet with at least one term found in
+    the (lowercased) message text, keeping the first matching term per sheet.
+    """
+    matches = {}
+    for term, term_lower, sheet_name in search_configs:
+        if sheet_name not in matches and term_lower in text:
+            matches[sheet_name] = term
+    return matches
+
+
+def _build_job(entity, message, term, sheet_name):
+    post_date = message.date.strftime("%Y-%m-%d")
+    # Construct a link if possible (public channels)
+    job_link = f"https://t.me/{entity.username}/{message.id}" if hasattr(entity, 'username') and entity.username else "Private Group/Channel"
+    return {
+        "job_url": job_link,
+        "title": f"Telegram: {entity.name}",
+        "company": "Telegram",
+        "location": "See Post",
+        "date_posted": post_date,
+        "job_type": term,
+        "description": message.text[:300] + "...",
+        "search_term": term,
+        "sheet_name": sheet_name,
+    }
+
+
+async def _scrape_channel(client, entity, search_configs, min_id=0, cutoff=None):
+    """
+    Reads one channel and returns (matched jobs, messages scanned, newest
+    message id). Only messages newer than `min_id` are requested; reading
+    stops at the first message older than `cutoff`.
+    """
+    jobs = []
+    msg_count = 0
+    newest_id = min_id
+    # Unknown channel: last INITIAL_MESSAGE_LIMIT messages. Known channel:
+    # everything since its high-water mark, which may exceed that on busy days.
+    limit = MAX_MESSAGES_PER_CHANNEL if min_id else INITIAL_MESSAGE_LIMIT
+    async for message in client.iter_messages(entity, limit=limit, min_id=min_id):
+        # Messages arrive newest first, so the rest are older than the cutoff too
+        if cutoff is not None and message.date < cutoff:
+            break
+        msg_count += 1
+        newest_id = max(newest_id, message.id)
+        if not message.text:
+            continue
+
+        # Check every search term against the message in one pass
+        matches = match_message(message.text.lower(), search_configs)
+        for sheet_name, term in matches.items():
+            jobs.append(_build_job(entity, message, term, sheet_name))
+    return jobs, msg_count, newest_id
+
+
+async def _scrape_channel_guarded(client, entity, search_configs, semaphore, min_id=0, cutoff=None):
+    """
+    Scrapes a channel under the shared semaphore with a timeout, retrying
+    after FloodWait errors with a jittered backoff. Never raises; failures
+    are reported in the returned stats, and leave the high-water mark as is.
+    """
+    async with semaphore:
+        started = time.perf_counter()
+        jobs, msg_count, newest_id, status = [], 0, min_id, "ok"
+
+        for attempt in range(MAX_FLOOD_RETRIES + 1):
+            try:
+                jobs, msg_count, newest_id = await asyncio.wait_for(
+                    _scrape_channel(client, entity, search_configs, min_id, cutoff), CHANNEL_TIMEOUT_SECONDS
+                )
+                status = "ok"
+                break
+            except FloodWaitError as e:
+                status = f"flood wait {e.seconds}s"
+                if attempt == MAX_FLOOD_RETRIES or e.seconds > MAX_FLOOD_WAIT_SECONDS:
+                    break
+                wait = backoff_delay(attempt, base_delay=1.0, retry_after=retry_after_seconds(e))
+                print(f"  ⏳ FloodWait on {entity.name}: sleeping {wait:.0f}s (retry {attempt + 1}/{MAX_FLOOD_RETRIES})")
+                await asyncio.sleep(wait)
+            except asyncio.TimeoutError:
+                status = f"timeout after {CHANNEL_TIMEOUT_SECONDS}s"
+                break
+            except Exception as e:
+                status = f"error: {e}"
+                break
+
+        if status != "ok":
+            print(f"Error scraping {entity.name}: {status}")
+            jobs, msg_count, newest_id = [], 0, min_id
+
+        stats = {
+            "channel": entity.name,
+            "newest_id": newest_id,
+            "messages": msg_count,
+            "matches": len(jobs),
+            "seconds": time.perf_counter() - started,
+            "status": status,
+        }
+        print(f"  -> Scanned {msg_count} messages in {entity.name} ({stats['seconds']:.1f}s)")
+        return jobs, stats
+
+
+def print_channel_report(channel_stats):
+    """
+    Prints per-channel latency and message counts, slowest first.
+    """
+    if not channel_stats:
+        return
+    print("⏱️  Telegram channel timings:")
+    for stats in sorted(channel_stats, key=lambda s: s["seconds"], reverse=True):
+        print(f"   {stats['channel'][:35]:<35} {stats['seconds']:6.1f}s "
+              f"messages={stats['messages']:<4} matches={stats['matches']:<4} {stats['status']}")
+
+
+async def scrape_telegram_jobs(api_id, api_hash, session_string, channels, search_terms,
+                               high_water_marks=None, hours_old=None):
     """
     Scrapes Telegram channels for messages containing specific keywords.
+    Opens a single session and reads each channel once, testing every search
+    term against each message. Channels are read concurrently (up to
+    MAX_CONCURRENT_CHANNELS at a time). `search_terms` can be plain terms or
+    SEARCH_CONFIGS-style dicts; each match is returned once per sheet, tagged
+    with `search_term` and `sheet_name` columns so callers can route it.
+
+    `high_water_marks` ({channel id: last seen message id}, see
+    load_high_water_marks) limits each channel to messages newer than its
+    mark and is updated in place; the caller saves it once the results are
+    safely stored. `hours_old` skips messages older than that many hours.
     """
     print("--- Starting Telegram Scraping ---")
+    search_configs = _normalize_search_configs(search_terms)
     jobs = []
-    
+
     try:
         async with TelegramClient(StringSession(session_string), api_id, api_hash) as client:
             # 1. Identify relevant channels from user's dialogs
@@ -22,44 +210,36 @@ async def scrape_telegram_jobs(api_id, api_hash, session_string, channels, searc
                     # User requested to scan ALL channels/groups
                     print(f"Adding channel to scan list: {dialog.name}")
                     target_channels.append(dialog)
-            
+
             if not target_channels:
                 print("No relevant channels found in your chat list. Please join some Job channels first!")
                 return pd.DataFrame()
 
-            # 2. Scrape them
-            for entity in target_channels:
-                print(f"Scraping channel: {entity.name}...")
-                try:
-                    # Fetch last 200 messages
-                    msg_count = 0
-                    async for message in client.iter_messages(entity, limit=200):
-                        msg_count += 1
-                        if message.text:
-                            text = message.text.lower()
-                            # Check if any search term is in the message
-                            for term in search_terms:
-                                if term.lower() in text:
-                                    # Found a match!
-                                    post_date = message.date.strftime("%Y-%m-%d")
-                                    # Construct a link if possible (public channels)
-                                    job_link = f"https://t.me/{entity.username}/{message.id}" if hasattr(entity, 'username') and entity.username else "Private Group/Channel"
-                                    
-                                    job = {
-                                        "job_url": job_link,
-                                        "title": f"Telegram: {entity.name}", 
-                                        "company": "Telegram",
-                                        "location": "See Post",
-                                        "date_posted": post_date,
-                                        "job_type": term, 
-                                        "description": message.text[:300] + "..." 
-                                    }
-                                    jobs.append(job)
-                                    break 
-                    print(f"  -> Scanned {msg_count} messages in {entity.name}")
-                except Exception as e:
-                    print(f"Error scraping {entity.name}: {e}")
-                    
+            # Telethon sleeps through FloodWaits of up to a minute by itself. That
+            # is fine for listing dialogs above, but while reading channels it
+            # would happen inside the channel timeout: raise them all from here
+            # on so _scrape_channel_guarded's backoff handles them
+            client.flood_sleep_threshold = 0
+
+            # 2. Scrape them concurrently; results come back in channel order
+            print(f"Scraping {len(target_channels)} channels ({MAX_CONCURRENT_CHANNELS} at a time)...")
+            marks = high_water_marks if high_water_marks is not None else {}
+            cutoff = None
+            if hours_old is not None:
+                cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours_old)
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHANNELS)
+            results = await asyncio.gather(*(
+                _scrape_channel_guarded(client, entity, search_configs, semaphore,
+                                        min_id=marks.get(str(entity.id), 0), cutoff=cutoff)
+                for entity in target_channels
+            ))
+
+            for entity, (channel_jobs, stats) in zip(target_channels, results):
+                jobs.extend(channel_jobs)
+                if stats["newest_id"]:
+                    marks[str(entity.id)] = stats["newest_id"]
+            print_channel_report([stats for _, stats in results])
+
     except Exception as e:
         print(f"Telegram connection error: {e}")
 
@@ -0,0 +1,113 @@
+"""
+Regression tests for sheet_sync.sync_sheet against the in-memory gspread
+fake from benchmarks/fakes.py.
+"""
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# Imported by sheets_session, which the fake session builds on
+for module in ("gspread", "oauth2client"):
+    pytest.importorskip(module)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from job_store import JobStore
+from sheet_sync import sync_sheet
+from fakes import FakeSheetsSession, FakeSpreadsheet
+
+SHEET = "Medical Coding"
+HEADERS = ["job_url", "title", "date_posted"]
+TODAY = date.today().isoformat()
+# The sheets' retention, as in main.HOURS_OLD
+HOURS_OLD = 72
+
+
+def job(n, date_posted=TODAY):
+    return {"job_url": f"https://example.com/jobs/{n}", "title": f"Medical Coder {n}", "date_posted": date_posted}
+
+
+def sheet_urls(spreadsheet):
+    return [row[0] for row in spreadsheet.worksheets[SHEET].rows[1:]]
+
+
+@pytest.fixture
+def spreadsheet():
+    return FakeSpreadsheet()
+
+
+@pytest.fixture
+def session(spreadsheet, monkeypatch):
+    session = FakeSheetsSession(spreadsheet)
+    monkeypatch.setattr(session.backend, "limiter", None)
+    return session
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    yield store
+    store.close()
+
+
+def seed_sheet(spreadsheet, store, jobs):
+    # A sheet that already holds `jobs`, as recorded by an earlier run
+    worksheet = spreadsheet.add_worksheet(SHEET)
+    worksheet.rows = [list(HEADERS)] + [[j[column] for column in HEADERS] for j in jobs]
+    store.add_jobs(SHEET, jobs, status="synced")
+
+
+def test_appends_new_rows_under_headers(spreadsheet, session, store):
+    store.add_jobs(SHEET, [job(1), job(2), job(3)])
+
+    sync_sheet(session, store, SHEET)
+
+    assert spreadsheet.worksheets[SHEET].rows[0] == HEADERS
+    assert sheet_urls(spreadsheet) == [job(n)["job_url"] for n in (1, 2, 3)]
+    assert store.pending_rows(SHEET) == []
+    assert store.synced_urls(SHEET) == {job(n)["job_url"] for n in (1, 2, 3)}
+
+    # Nothing left to push: a second sync does not touch the sheet
+    sync_sheet(session, store, SHEET)
+    assert len(spreadsheet.worksheets[SHEET].rows) == 4
+
+
+def test_rows_already_in_sheet_are_not_appended_again(spreadsheet, session, store):
+    seed_sheet(spreadsheet, store, [job(1)])
+    # A run that died after appending job 2 but before recording it
+    spreadsheet.worksheets[SHEET].rows.append([job(2)[column] for column in HEADERS])
+    assert store.add_jobs(SHEET, [job(1), job(2), job(3)]) == 2
+
+    sync_sheet(session, store, SHEET)
+
+    assert sheet_urls(spreadsheet) == [job(n)["job_url"] for n in (1, 2, 3)]
+    assert store.synced_urls(SHEET) == {job(n)["job_url"] for n in (1, 2, 3)}
+
+
+def test_expired_rows_are_deleted_in_non_contiguous_ranges(spreadsheet, session, store, monkeypatch):
+    old = "2020-01-01"
+    jobs = [job(1), job(2, old), job(3, old), job(4), job(5, old), job(6)]
+    seed_sheet(spreadsheet, store, jobs)
+    store.add_jobs(SHEET, [job(7)])
+    assert store.expire(SHEET, HOURS_OLD) == 3
+
+    deletes = []
+    batch_update = spreadsheet.batch_update
+    monkeypatch.setattr(spreadsheet, "batch_update", lambda body: deletes.append(body) or batch_update(body))
+
+    sync_sheet(session, store, SHEET)
+
+    assert sheet_urls(spreadsheet) == [job(n)["job_url"] for n in (1, 4, 6, 7)]
+    ranges = [(r["deleteDimension"]["range"]["startIndex"], r["deleteDimension"]["range"]["endIndex"])
+              for body in deletes for r in body["requests"]]
+    # Rows 2-3 and 5 (grid indexes after the header), deleted bottom-up
+    assert ranges == [(5, 6), (2, 4)]
+    assert store.expiring_urls(SHEET) == set()
+    assert store.synced_urls(SHEET) == {job(n)["job_url"] for n in (1, 4, 6, 7)}
+
+    # Expired jobs stay known, so a later scrape does not add them back
+    assert store.add_jobs(SHEET, [job(2, old)]) == 0